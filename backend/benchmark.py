@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the backend at several concurrency levels
+
+Start the implementations to compare on different ports, e.g. the previous
+sync build on :8000 and the async build on :8001, then run
+
+    python benchmark.py --target sync=http://localhost:8000 --target async=http://localhost:8001 \
+        --email bench@example.com --password secret
+
+Each target is hit with the same mix of stock, news and auth requests at
+every concurrency level, and the results are printed side by side.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/stock-info?ticker_symbol={ticker}",
+    "/stock-history?ticker_symbol={ticker}&tail=250",
+    "/performance-snapshot?ticker_symbol={ticker}",
+    "/top-gainers-and-losers?n=10",
+    "/news-by-ticker?ticker_symbol={ticker}&limit=20",
+    "/profile",
+]
+
+
+async def login(base_url, email, password):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/login", json={"email": email, "password": password})
+        if response.status_code == 401:
+            response = await client.post("/register", json={"name": "benchmark", "email": email, "password": password})
+        response.raise_for_status()
+        return response.json()["token"]
+
+
+async def run_level(base_url, token, paths, concurrency, requests_per_client):
+    """Run concurrency clients, each sending requests_per_client requests back to back."""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker(offset):
+            nonlocal errors
+            for i in range(requests_per_client):
+                path = paths[(offset + i) % len(paths)]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    # Routes report failures in the body, so check both.
+                    if response.status_code != 200 or response.json().get("status", 200) != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare backend throughput at several concurrency levels.")
+    parser.add_argument("--target", action="append", required=True, help="name=base_url, repeatable")
+    parser.add_argument("--concurrency", default="50,200,1000", help="comma separated client counts")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client per level")
+    parser.add_argument("--path", action="append", help="request path, repeatable; {ticker} is substituted")
+    parser.add_argument("--ticker", default="RELIANCE.NS")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+
+    paths = [path.format(ticker=args.ticker) for path in args.path or DEFAULT_PATHS]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    targets = [target.split("=", 1) for target in args.target]
+
+    print(f"{'target':<10} {'clients':>7} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, base_url in targets:
+        token = await login(base_url, args.email, args.password)
+        for concurrency in levels:
+            result = await run_level(base_url, token, paths, concurrency, args.requests)
+            print(f"{name:<10} {concurrency:>7} {result['requests']:>9} {result['errors']:>7} "
+                  f"{result['throughput']:>9.1f} {result['p50']:>9.1f} {result['p95']:>9.1f} {result['p99']:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Per-request CPU cost of serializing a ticker's history, old path vs frame_json
+
+The old path formats dates with .dt.strftime, builds records with to_dict and
+lets FastAPI validate and encode them against response_model=dict. The new
+path encodes the DataFrame straight to JSON bytes. Both are served through
+FastAPI so framework overhead is included.
+
+    python benchmark_serialization.py --rows 1250 --columns 88 --requests 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.frame_json import frame_payload, json_response
+
+
+def make_history(rows, columns, seed=0):
+    """Random frame shaped like a ticker table: a Date column plus float indicator columns."""
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(100, 10, (rows, columns - 1)), columns=[f"col_{i}" for i in range(columns - 1)])
+    data.insert(0, "Date", pd.bdate_range("2020-01-01", periods=rows))
+    return data
+
+
+def make_app(history):
+    app = FastAPI()
+
+    @app.get("/old", response_model=dict)
+    def old():
+        data = history.copy()
+        for col in data.select_dtypes(include=['datetime64']).columns:
+            data[col] = data[col].dt.strftime('%Y-%m-%d')
+        data_dict = data.to_dict(orient="records")
+        return {"data": data_dict, "message": "Stock data retrieved successfully", "status": 200}
+
+    @app.get("/new")
+    def new(orient: str = "records"):
+        return json_response({"data": frame_payload(history, orient), "message": "Stock data retrieved successfully",
+                              "status": 200})
+
+    return app
+
+
+def measure(client, path, requests):
+    client.get(path)
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(path)
+    return (time.process_time() - started) / requests * 1000, response
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare response serialization CPU per request.")
+    parser.add_argument("--rows", type=int, default=1250)
+    parser.add_argument("--columns", type=int, default=88)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    history = make_history(args.rows, args.columns)
+    client = TestClient(make_app(history))
+
+    old_ms, old_response = measure(client, "/old", args.requests)
+    new_ms, new_response = measure(client, "/new", args.requests)
+    columns_ms, _ = measure(client, "/new?orient=columns", args.requests)
+
+    identical = json.loads(old_response.content) == json.loads(new_response.content)
+    print(f"{args.rows} rows x {args.columns} columns, {args.requests} requests each")
+    print(f"{'path':<22} {'cpu ms/request':>15} {'speedup':>8}")
+    print(f"{'old (to_dict)':<22} {old_ms:>15.1f} {1:>8.1f}")
+    print(f"{'new records':<22} {new_ms:>15.1f} {old_ms / new_ms:>8.1f}")
+    print(f"{'new columns':<22} {columns_ms:>15.1f} {old_ms / columns_ms:>8.1f}")
+    print(f"records output identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
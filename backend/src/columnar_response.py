@@ -0,0 +1,40 @@
+from typing import Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import Response
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+COLUMNAR_MEDIA_TYPES = {
+    ARROW_STREAM: ARROW_STREAM,
+    PARQUET: PARQUET,
+    "application/x-parquet": PARQUET,
+    "application/parquet": PARQUET,
+}
+
+
+def negotiate_columnar(accept: Optional[str]):
+    """Return the columnar media type requested in the Accept header, if any."""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in COLUMNAR_MEDIA_TYPES:
+            return COLUMNAR_MEDIA_TYPES[media_type]
+    return None
+
+
+def columnar_response(data: pd.DataFrame, media_type: str):
+    """Encode data as an Arrow IPC stream or a Parquet file, keeping native column types."""
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+
+    if media_type == ARROW_STREAM:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink, compression="zstd")
+
+    return Response(content=sink.getvalue().to_pybytes(), media_type=media_type)
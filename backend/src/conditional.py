@@ -0,0 +1,67 @@
+import hashlib
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def make_etag(*parts):
+    """Strong ETag over the parts that determine a response body."""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest() + '"'
+
+
+def to_http_datetime(value):
+    """Normalise a date, datetime or ISO string to an aware UTC datetime at second precision."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None):
+    """
+    Evaluate If-None-Match, then If-Modified-Since (only when If-None-Match is
+    absent), as RFC 9110 orders them.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None):
+    # Authenticated data: shared caches must not keep it, clients must revalidate.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None):
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def with_validators(response, etag: str, last_modified: Optional[datetime] = None):
+    """Attach ETag/Last-Modified to a successful response; errors are returned untouched."""
+    if isinstance(response, dict):
+        if response.get("status") != 200:
+            return response
+        response = JSONResponse(content=jsonable_encoder(response))
+    if response.status_code == 200:
+        response.headers.update(validator_headers(etag, last_modified))
+    return response
@@ -0,0 +1,150 @@
+import os
+import ssl
+import pandas as pd
+from pymongo import AsyncMongoClient, MongoClient
+from sqlalchemy import create_engine, inspect, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# libpq query options asyncpg does not accept as connect() keywords. SSL ones
+# become the ssl argument, application_name and connect_timeout are mapped
+# to their asyncpg equivalents, the rest have none and are dropped.
+LIBPQ_SSL_OPTIONS = ("sslmode", "sslrootcert", "sslcert", "sslkey", "sslpassword", "sslcrl", "sslcompression")
+LIBPQ_OPTIONS = LIBPQ_SSL_OPTIONS + ("application_name", "connect_timeout", "channel_binding", "gssencmode",
+                                     "keepalives", "keepalives_idle", "keepalives_interval", "keepalives_count",
+                                     "client_encoding", "options")
+
+
+def _pool_options(database_url: str):
+    options = {
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    }
+    if not database_url.startswith("sqlite"):
+        options.update({
+            "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+            "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+            "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        })
+    return options
+
+
+def create_pooled_engine(database_url: str):
+    """
+    Create the process-wide engine. Pool sizing comes from DB_POOL_SIZE,
+    DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and DB_POOL_PRE_PING.
+    """
+    return create_engine(database_url, **_pool_options(database_url))
+
+
+def to_async_url(database_url: str):
+    """
+    Swap the sync driver in DATABASE_URL for its asyncio counterpart.
+
+    Returns the URL and the connect_args it needs: asyncpg rejects libpq
+    query options such as ?sslmode=require, so they are moved out of the
+    query string (see LIBPQ_OPTIONS).
+    """
+    scheme, rest = database_url.split("://", 1)
+    url = make_url(f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}")
+    if url.get_driver_name() != "asyncpg":
+        return url, {}
+
+    options = {key: value if isinstance(value, str) else value[-1]
+               for key, value in url.query.items() if key in LIBPQ_OPTIONS}
+    url = url.difference_update_query(LIBPQ_OPTIONS)
+    connect_args = {}
+    ssl_arg = _asyncpg_ssl(options)
+    if ssl_arg is not None:
+        connect_args["ssl"] = ssl_arg
+    if "application_name" in options:
+        connect_args["server_settings"] = {"application_name": options["application_name"]}
+    if "connect_timeout" in options:
+        connect_args["timeout"] = float(options["connect_timeout"])
+    return url, connect_args
+
+
+def _asyncpg_ssl(options: dict):
+    """asyncpg ssl argument for libpq sslmode/sslrootcert/sslcert/sslkey, None when no SSL option is set."""
+    mode = options.get("sslmode")
+    if not any(key in options for key in ("sslrootcert", "sslcert", "sslkey")):
+        return mode
+    if mode == "disable":
+        return False
+
+    context = ssl.create_default_context(cafile=options.get("sslrootcert"))
+    if options.get("sslcert"):
+        context.load_cert_chain(options["sslcert"], options.get("sslkey"), options.get("sslpassword"))
+    if mode != "verify-full":
+        context.check_hostname = False
+    if mode in (None, "allow", "prefer", "require") and not options.get("sslrootcert"):
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def create_async_pooled_engine(database_url: str):
+    """Async engine for request handlers, sized by the same DB_POOL_* settings."""
+    url, connect_args = to_async_url(database_url)
+    return create_async_engine(url, connect_args=connect_args, **_pool_options(database_url))
+
+
+async def read_sql_async(engine: AsyncEngine, query, params: dict = None):
+    """Async counterpart of pd.read_sql_query."""
+    async with engine.connect() as conn:
+        result = await conn.execute(query, params or {})
+        return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+
+
+async def get_table_columns(engine: AsyncEngine, table: str):
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda sync_conn: [col["name"] for col in inspect(sync_conn).get_columns(table)])
+
+
+async def get_tables_columns(engine: AsyncEngine, tables: list):
+    """Column names of each existing table in one reflection pass; missing tables are left out."""
+    def reflect(sync_conn):
+        reflected = inspect(sync_conn).get_multi_columns(filter_names=tables)
+        return {name: [col["name"] for col in columns] for (_, name), columns in reflected.items()}
+
+    async with engine.connect() as conn:
+        return await conn.run_sync(reflect)
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    for metric in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, metric):
+            status[metric] = getattr(pool, metric)()
+    return status
+
+
+def _mongo_options():
+    return {
+        "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", 0)),
+        "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 300000)),
+        "connectTimeoutMS": int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+        "socketTimeoutMS": int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", 20000)),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+    }
+
+
+def create_mongo_client(mongo_url: str):
+    """
+    Create the process-wide MongoClient. Pool sizing and timeouts come from
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS and
+    MONGO_SERVER_SELECTION_TIMEOUT_MS.
+    """
+    return MongoClient(mongo_url, **_mongo_options())
+
+
+def create_async_mongo_client(mongo_url: str):
+    """AsyncMongoClient for request handlers, configured like create_mongo_client."""
+    return AsyncMongoClient(mongo_url, **_mongo_options())
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+CHART_MODES = ("lttb", "ohlc")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int):
+    """
+    Largest-Triangle-Three-Buckets: indices of the points that best keep the
+    visual shape of y. The first and last points are always kept.
+
+    Selection is sequential by nature (each bucket depends on the point picked
+    before it), so this loops over buckets, but every bucket is scored in one
+    vectorized step and the next-bucket averages are computed up front.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+
+    # Buckets for the n - 2 interior points; the last start is the final point.
+    starts = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    starts[-1] = n - 1
+    counts = np.diff(np.append(starts, n))
+    avg_x = np.add.reduceat(x, starts) / counts
+    avg_y = np.add.reduceat(y, starts) / counts
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = starts[i], starts[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def lttb_frame(data: pd.DataFrame, points: int, value: str = "Close"):
+    """Date and value columns of data downsampled with LTTB."""
+    data = data[["Date", value]].dropna().reset_index(drop=True)
+    x = pd.to_datetime(data["Date"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+    return data.iloc[lttb_indices(x, data[value].to_numpy(), points)].reset_index(drop=True)
+
+
+def ohlc_frame(data: pd.DataFrame, points: int):
+    """
+    Aggregate consecutive bars into at most points OHLCV bars of near-equal
+    size. Each bucket is dated by its first bar.
+    """
+    data = data.dropna(subset=["Close"]).reset_index(drop=True)
+    n = len(data)
+    if points >= n:
+        return data[["Date", "Open", "High", "Low", "Close", "Volume"]]
+
+    starts = (np.arange(points) * (n / points)).astype(np.int64)
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        "Date": data["Date"].to_numpy()[starts],
+        "Open": data["Open"].to_numpy()[starts],
+        "High": np.fmax.reduceat(data["High"].to_numpy(dtype=np.float64), starts),
+        "Low": np.fmin.reduceat(data["Low"].to_numpy(dtype=np.float64), starts),
+        "Close": data["Close"].to_numpy()[ends],
+        "Volume": np.add.reduceat(np.nan_to_num(data["Volume"].to_numpy(dtype=np.float64)), starts),
+    })
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import Response
+
+FRAME_ORIENTS = ("records", "columns")
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is pd.NA or value is pd.NaT:
+        return None
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _format_dates(values: np.ndarray):
+    """datetime64 values as YYYY-MM-DD strings, NaT as None, without a Python-level strftime."""
+    strings = np.datetime_as_string(values.astype("datetime64[D]"), unit="D").astype(object)
+    strings[np.isnat(values)] = None
+    return strings
+
+
+def _column(series: pd.Series, as_list: bool):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _format_dates(series.dt.tz_localize(None).to_numpy() if series.dt.tz else series.to_numpy()).tolist()
+    if series.dtype == object:
+        sample = series.dropna()
+        if not sample.empty and isinstance(sample.iloc[0], (date, datetime)):
+            return _format_dates(pd.to_datetime(series).to_numpy()).tolist()
+        return series.tolist()
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.astype(object).where(series.notna(), None).tolist()
+    # Plain numpy columns: orjson encodes the array itself (NaN becomes null).
+    values = np.ascontiguousarray(series.to_numpy())
+    return values.tolist() if as_list else values
+
+
+def frame_payload(data: pd.DataFrame, orient: str = "records"):
+    """
+    JSON-ready structure for a DataFrame with dates rendered as YYYY-MM-DD,
+    like the old strftime + to_dict path. "records" gives a list of row
+    objects, "columns" a {column: [values]} object.
+    """
+    if orient not in FRAME_ORIENTS:
+        raise ValueError(f"Unsupported orient: {orient}")
+    if orient == "columns":
+        return {col: _column(data[col], as_list=False) for col in data.columns}
+    columns = list(data.columns)
+    values = [_column(data[col], as_list=True) for col in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def dumps(payload):
+    return orjson.dumps(payload, default=_default, option=JSON_OPTIONS)
+
+
+def json_response(payload: dict, status_code: int = 200):
+    """Encode payload straight to bytes, bypassing jsonable_encoder and response_model validation."""
+    return Response(content=dumps(payload), status_code=status_code, media_type="application/json")
@@ -0,0 +1,128 @@
+from sqlalchemy import text
+
+
+# Rollup tiers data-generation-ms maintains in price_bars (src/bar_rollups.py there), finest first.
+BAR_INTERVALS = ("weekly", "monthly")
+HISTORY_INTERVALS = ("daily",) + BAR_INTERVALS
+BAR_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+def build_history_query(ticker: str, table_columns: list, columns: list = None, start=None, end=None,
+                        limit: int = None, tail: int = None):
+    """
+    Build a SELECT on the ticker table with the projection, date range and
+    row limit pushed down. tail returns the last rows, oldest first.
+    """
+    return _build_select(f"\"{ticker}\"", table_columns, columns, start, end, limit, tail)
+
+
+def _build_select(source: str, table_columns: list, columns: list, start, end, limit: int, tail: int):
+    if columns:
+        unknown = [col for col in columns if col not in table_columns]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        selected = ["Date"] + [col for col in columns if col != "Date"]
+    else:
+        selected = table_columns
+
+    select = ", ".join(f"\"{col}\"" for col in selected)
+    query = f"SELECT {select} FROM {source}"
+    conditions = []
+    params = {}
+    if start is not None:
+        conditions.append("\"Date\" >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("\"Date\" <= :end")
+        params["end"] = end
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    if tail:
+        query += " ORDER BY \"Date\" DESC LIMIT :n"
+        query = f"SELECT * FROM ({query}) AS tail_rows ORDER BY \"Date\""
+        params["n"] = tail
+    else:
+        query += " ORDER BY \"Date\""
+        if limit:
+            query += " LIMIT :n"
+            params["n"] = limit
+
+    return text(query), params
+
+
+def build_bars_query(ticker: str, interval: str, columns: list = None, start=None, end=None,
+                     limit: int = None, tail: int = None):
+    """
+    build_history_query on the weekly or monthly rollups. Bars are dated by
+    the first day of their period; start keeps the bar that contains it.
+    """
+    if interval not in BAR_INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    bars = ("SELECT date AS \"Date\", open AS \"Open\", high AS \"High\", low AS \"Low\", close AS \"Close\", "
+            "volume AS \"Volume\" FROM price_bars WHERE ticker = :bar_ticker AND period = :bar_period")
+    params = {"bar_ticker": ticker, "bar_period": interval}
+    if start is not None:
+        bars += " AND last_date >= :start"
+        params["start"] = start
+    query, select_params = _build_select(f"({bars}) AS bars", BAR_COLUMNS, columns, None, end, limit, tail)
+    return query, {**params, **select_params}
+
+
+def build_bar_counts_query(ticker: str, start=None, end=None):
+    """Number of bars per rollup tier covering the date range."""
+    query = "SELECT period, COUNT(*) AS bars FROM price_bars WHERE ticker = :ticker"
+    params = {"ticker": ticker}
+    if start is not None:
+        query += " AND last_date >= :start"
+        params["start"] = start
+    if end is not None:
+        query += " AND date <= :end"
+        params["end"] = end
+    return text(query + " GROUP BY period"), params
+
+
+def choose_interval(bar_counts: dict, points: int):
+    """Coarsest tier that still has at least points bars over the range; daily when none does."""
+    for interval in reversed(BAR_INTERVALS):
+        if bar_counts.get(interval, 0) >= points:
+            return interval
+    return "daily"
+
+
+def build_watermark_query(ticker: str, dialect):
+    """
+    Last bar date and row count of the ticker table, read off the Date index.
+    Callers must check the table exists first; the name is quoted by the dialect.
+    """
+    table = dialect.identifier_preparer.quote(ticker)
+    return text(f"SELECT MAX(\"Date\") AS last_date, COUNT(*) AS row_count FROM {table}")
+
+
+def shared_columns(tables: dict):
+    """Columns present in every table, in the first table's order."""
+    first = next(iter(tables.values()))
+    return [col for col in first if all(col in table_columns for table_columns in tables.values())]
+
+
+def build_batch_history_query(tables: dict, columns: list = None, start=None, end=None,
+                              limit: int = None, tail: int = None):
+    """
+    One UNION ALL over several ticker tables, tagged with a ticker column.
+
+    tables maps ticker to its column names. Without a projection, the columns
+    shared by every table are selected, so the branches line up.
+    """
+    if not columns:
+        columns = shared_columns(tables)
+
+    branches = []
+    params = {}
+    for i, (ticker, table_columns) in enumerate(tables.items()):
+        query, branch_params = build_history_query(ticker, table_columns, columns, start, end, limit, tail)
+        branches.append(f"SELECT CAST(:ticker_{i} AS VARCHAR) AS ticker, h{i}.* FROM ({query.text}) AS h{i}")
+        params.update(branch_params)
+        params[f"ticker_{i}"] = ticker
+
+    query = " UNION ALL ".join(branches)
+    return text(f"SELECT * FROM ({query}) AS batch ORDER BY ticker, \"Date\""), params
@@ -0,0 +1,181 @@
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from src.database import create_mongo_client, create_pooled_engine
+
+load_dotenv()
+
+# Mongo indexes on stock_news.articles. _id is the keyset tie-break used by the
+# news routes, so it is part of both keys to keep the sort fully index-backed.
+MONGO_INDEXES = {
+    "articles": [
+        {"name": "company_published_date", "keys": [("company", 1), ("published_date", -1), ("_id", -1)]},
+        {"name": "published_date", "keys": [("published_date", -1), ("_id", -1)]},
+    ],
+}
+
+SQL_INDEXES = {
+    "stock_info": [{"name": "stock_info_ticker_idx", "columns": ["ticker"]}],
+    "prices": [{"name": "prices_ticker_date_idx", "columns": ["ticker", "date"]}],
+}
+
+# Every per-ticker history table gets this index; the tables are found through stock_info.
+TICKER_TABLE_INDEX = {"columns": ["Date"]}
+
+
+def _has_prefix(existing: list, required: list):
+    return list(existing[:len(required)]) == list(required)
+
+
+def ticker_tables(engine):
+    inspector = inspect(engine)
+    if not inspector.has_table("stock_info"):
+        return []
+    with engine.connect() as conn:
+        tickers = [row[0] for row in conn.execute(text("SELECT ticker FROM stock_info"))]
+    return [ticker for ticker in tickers if inspector.has_table(ticker)]
+
+
+def declared_sql_indexes(engine):
+    declared = {table: list(indexes) for table, indexes in SQL_INDEXES.items()}
+    for table in ticker_tables(engine):
+        declared[table] = [{"name": f"{table}_date_idx", **TICKER_TABLE_INDEX}]
+    return declared
+
+
+def check_sql_indexes(engine):
+    """Return the declared SQL indexes that are missing, skipping tables that do not exist yet."""
+    inspector = inspect(engine)
+    missing = []
+    for table, indexes in declared_sql_indexes(engine).items():
+        if not inspector.has_table(table):
+            continue
+        existing = [index["column_names"] for index in inspector.get_indexes(table)]
+        existing.append(inspector.get_pk_constraint(table).get("constrained_columns") or [])
+        for index in indexes:
+            if not any(_has_prefix(columns, index["columns"]) for columns in existing):
+                missing.append({"table": table, **index})
+    return missing
+
+
+def unused_sql_indexes(engine):
+    """Indexes Postgres has never scanned since its statistics were last reset."""
+    if engine.dialect.name != "postgresql":
+        return []
+    query = text(
+        "SELECT relname AS table, indexrelname AS name FROM pg_stat_user_indexes "
+        "WHERE idx_scan = 0 ORDER BY relname, indexrelname"
+    )
+    with engine.connect() as conn:
+        return [dict(row._mapping) for row in conn.execute(query)]
+
+
+def _missing_mongo_indexes(existing_keys: dict):
+    """existing_keys maps collection to the key lists of its indexes."""
+    missing = []
+    for collection, indexes in MONGO_INDEXES.items():
+        for index in indexes:
+            if not any(_has_prefix(keys, index["keys"]) for keys in existing_keys[collection]):
+                missing.append({"collection": collection, **index})
+    return missing
+
+
+def _unused_mongo_indexes(collection: str, index_stats):
+    return [{"collection": collection, "name": stats["name"]} for stats in index_stats
+            if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0]
+
+
+def check_mongo_indexes(database):
+    existing_keys = {collection: [info["key"] for info in database[collection].index_information().values()]
+                     for collection in MONGO_INDEXES}
+    return _missing_mongo_indexes(existing_keys)
+
+
+def unused_mongo_indexes(database):
+    """Indexes with no recorded accesses since the server started, excluding _id_."""
+    unused = []
+    for collection in MONGO_INDEXES:
+        unused += _unused_mongo_indexes(collection, database[collection].aggregate([{"$indexStats": {}}]))
+    return unused
+
+
+async def mongo_index_report(database):
+    """Missing and unused Mongo indexes through an async database, such as the backend's shared client."""
+    existing_keys = {}
+    unused = []
+    for collection in MONGO_INDEXES:
+        existing_keys[collection] = [info["key"] for info in (await database[collection].index_information()).values()]
+        cursor = await database[collection].aggregate([{"$indexStats": {}}])
+        unused += _unused_mongo_indexes(collection, await cursor.to_list(None))
+    return {"missing": _missing_mongo_indexes(existing_keys), "unused": unused}
+
+
+def ensure_sql_indexes(engine):
+    created = []
+    for index in check_sql_indexes(engine):
+        columns = ", ".join(f"\"{col}\"" for col in index["columns"])
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS \"{index['name']}\" ON \"{index['table']}\" ({columns})"))
+        created.append(index)
+    return created
+
+
+def ensure_mongo_indexes(database):
+    created = []
+    for index in check_mongo_indexes(database):
+        database[index["collection"]].create_index(index["keys"], name=index["name"])
+        created.append(index)
+    return created
+
+
+def index_report(engine=None, database=None):
+    """Missing and unused indexes for whichever stores are given."""
+    report = {"missing": [], "unused": []}
+    if engine is not None:
+        report["missing"] += check_sql_indexes(engine)
+        report["unused"] += unused_sql_indexes(engine)
+    if database is not None:
+        report["missing"] += check_mongo_indexes(database)
+        report["unused"] += unused_mongo_indexes(database)
+    return report
+
+
+def ensure_indexes(engine=None, database=None):
+    created = []
+    if engine is not None:
+        created += ensure_sql_indexes(engine)
+    if database is not None:
+        created += ensure_mongo_indexes(database)
+    for index in created:
+        print(f"Created index {index['name']} on {index.get('table') or index.get('collection')}")
+    return created
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and verify the indexes the backend queries rely on.")
+    parser.add_argument("--check", action="store_true",
+                        help="only report missing and unused indexes; exit 1 if any are missing")
+    args = parser.parse_args(argv)
+
+    engine = create_pooled_engine(os.environ.get("DATABASE_URL"))
+    client = create_mongo_client(os.environ.get("MONGO_URI"))
+    database = client["stock_news"]
+    try:
+        if not args.check:
+            ensure_indexes(engine, database)
+        report = index_report(engine, database)
+    finally:
+        client.close()
+        engine.dispose()
+
+    for index in report["missing"]:
+        print(f"Missing index {index['name']} on {index.get('table') or index.get('collection')}")
+    for index in report["unused"]:
+        print(f"Unused index {index['name']} on {index.get('table') or index.get('collection')}")
+    return 1 if report["missing"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
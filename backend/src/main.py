@@ -1,31 +1,76 @@
+import asyncio
 import uuid
-from datetime import datetime, timedelta, timezone
-from fastapi import FastAPI, HTTPException, Depends, Header
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
 import jwt
 from dotenv import load_dotenv
 from passlib.hash import bcrypt
-from sqlalchemy import create_engine, Column, String, DateTime, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from src.schemas import UserCreate, UserLogin, UserResponse, TokenResponse, UserProfileResponse
+from sqlalchemy import Column, String, DateTime, text, bindparam, inspect, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+from src.database import (create_async_mongo_client, create_async_pooled_engine, create_mongo_client,
+                          create_pooled_engine, get_table_columns, get_tables_columns, pool_status, read_sql_async)
+from src.columnar_response import columnar_response, negotiate_columnar
+from src.downsample import CHART_MODES, lttb_frame, ohlc_frame
+from src.conditional import is_not_modified, make_etag, not_modified_response, to_http_datetime, with_validators
+from src.frame_json import FRAME_ORIENTS, frame_payload, json_response
+from src.history import (HISTORY_INTERVALS, build_bar_counts_query, build_bars_query, build_batch_history_query,
+                         build_history_query, build_watermark_query, choose_interval, shared_columns)
+from src.indexes import ensure_indexes, index_report, mongo_index_report
+from src.news import (NEWS_SORT, build_news_filter, fetch_news_page, get_page_size, parse_fields,
+                      serialize_article)
+from src.streaming import STREAM_CHUNK_SIZE, STREAM_FORMATS, stream_documents, stream_frames, stream_media_type
+from src.price_matrix import open_price_matrix
+from src.response_cache import (STOCK_INFO_SCOPE, TOP_GAINERS_LOSERS_SCOPE, DataVersions, ResponseCache,
+                                cached_response, history_scope)
+from src.schemas import (UserCreate, UserLogin, UserResponse, TokenResponse, UserProfileResponse, BatchHistoryRequest,
+                         BatchInfoRequest)
 import yfinance as yf
 import pandas as pd
-from pymongo import MongoClient
+import numpy as np
+from pymongo.asynchronous.collection import AsyncCollection
 
 load_dotenv()
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 JWT_SECRET = os.environ.get("JWT_SECRET")
 MONGO_DB_URL = os.environ.get("MONGO_URI")
+BATCH_MAX_TICKERS = int(os.environ.get("BATCH_MAX_TICKERS", 50))
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 2000))
+ENSURE_INDEXES_ON_STARTUP = os.environ.get("ENSURE_INDEXES_ON_STARTUP", "true").lower() == "true"
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# The sync engine only runs schema and index maintenance; request handlers use async_engine.
+engine = create_pooled_engine(DATABASE_URL)
+async_engine = create_async_pooled_engine(DATABASE_URL)
+SessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+response_cache = ResponseCache()
+data_versions = DataVersions()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.mongo_client = create_async_mongo_client(MONGO_DB_URL)
+    if ENSURE_INDEXES_ON_STARTUP:
+        try:
+            with create_mongo_client(MONGO_DB_URL) as admin_client:
+                await run_in_threadpool(ensure_indexes, engine, admin_client["stock_news"])
+        except Exception as e:
+            print(f"Error ensuring indexes: {str(e)}")
+    yield
+    await app.state.mongo_client.close()
+    await async_engine.dispose()
+
 
 app = FastAPI(title="Backend Microservice", version="1.0.0",
-              description="Stokis Backend Microservice")
+              description="Stokis Backend Microservice", lifespan=lifespan)
 
 origins = ["*"]
 
@@ -60,12 +105,46 @@ class User(Base):
 Base.metadata.create_all(engine)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_engine():
+    return async_engine
+
+
+def get_news_collection(request: Request):
+    return request.app.state.mongo_client["stock_news"]["articles"]
+
+
+async def version_validators(engine, endpoint: str, scope: str, params: dict):
+    """ETag and Last-Modified from the ingestion data version, or None if the scope has no version yet."""
+    entry = await data_versions.get_entry(engine, scope)
+    if entry is None or not entry[0]:
+        return None
+    version, updated_at = entry
+    return make_etag(endpoint, scope, version, sorted(params.items())), to_http_datetime(updated_at)
+
+
+async def history_validators(engine, ticker_symbol: str, params: dict):
+    """
+    Data version when ingestion has recorded one, otherwise an ETag over the
+    last bar date plus row count. The fallback sends no Last-Modified: the
+    newest bar date does not move when older bars are rewritten.
+    """
+    validators = await version_validators(engine, "/stock-history", history_scope(ticker_symbol), params)
+    if validators is not None:
+        return validators
+    try:
+        async with engine.connect() as conn:
+            # Unknown tickers get no validators and fall through to the usual error.
+            if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(ticker_symbol)):
+                return None
+            last_date, row_count = (await conn.execute(build_watermark_query(ticker_symbol, conn.dialect))).one()
+    except Exception:
+        return None
+    return make_etag("/stock-history", ticker_symbol, str(last_date), row_count, sorted(params.items())), None
 
 
 def create_access_token(user_id: str, name: str, email: str):
@@ -99,20 +178,63 @@ def health_check():
     return {"message": "Backend is running!", "status": 200}
 
 
+@app.get("/health/mongo", tags=["Health"])
+async def mongo_health_check(request: Request):
+    try:
+        await request.app.state.mongo_client.admin.command("ping")
+        return {"message": "MongoDB is reachable", "status": 200}
+    except Exception as e:
+        return {"message": f"MongoDB is unreachable: {str(e)}", "status": 503}
+
+
+@app.get("/metrics/db-pool", tags=["Health"])
+def get_db_pool_metrics(engine: AsyncEngine = Depends(get_engine)):
+    return {"data": pool_status(engine), "message": "Database pool metrics retrieved successfully", "status": 200}
+
+
+@app.get("/metrics/response-cache", tags=["Health"])
+def get_response_cache_metrics():
+    return {"data": response_cache.stats(), "message": "Response cache metrics retrieved successfully", "status": 200}
+
+
+@app.post("/cache/invalidate", tags=["Health"])
+def invalidate_response_cache(endpoint: Optional[str] = None, ticker_symbol: Optional[str] = None,
+                              credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    scope = history_scope(ticker_symbol) if ticker_symbol else None
+    removed = response_cache.invalidate(endpoint, scope)
+    data_versions.expire()
+    return {"removed": removed, "message": "Response cache invalidated", "status": 200}
+
+
+@app.get("/metrics/indexes", tags=["Health"])
+async def get_index_report(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    try:
+        report = await run_in_threadpool(index_report, engine)
+        mongo_report = await mongo_index_report(request.app.state.mongo_client["stock_news"])
+        report["missing"] += mongo_report["missing"]
+        report["unused"] += mongo_report["unused"]
+        return {"data": report, "message": "Index report retrieved successfully", "status": 200}
+    except Exception as e:
+        return {"message": f"Error retrieving index report: {str(e)}", "status": 500}
+
+
 @app.post("/register", response_model=TokenResponse, tags=["Auth"])
-def register_user(user_create: UserCreate):
-    db = next(get_db())
-    existing_user = db.query(User).filter(
-        User.email == user_create.email).first()
+async def register_user(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing_user = (await db.execute(select(User).filter(
+        User.email == user_create.email))).scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail={
                             "message": "Email already registered", "status": 400})
 
     user = User(name=user_create.name, email=user_create.email)
-    user.set_password(user_create.password)
+    await run_in_threadpool(user.set_password, user_create.password)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     token = create_access_token(user.id, user.name, user.email)
     user_response = UserResponse(id=user.id, name=user.name, email=user.email,
@@ -121,10 +243,9 @@ def register_user(user_create: UserCreate):
 
 
 @app.post("/login", response_model=TokenResponse, tags=["Auth"])
-def login_user(user_login: UserLogin):
-    db = next(get_db())
-    user = db.query(User).filter(User.email == user_login.email).first()
-    if not user or not user.check_password(user_login.password):
+async def login_user(user_login: UserLogin, db: AsyncSession = Depends(get_db)):
+    user = (await db.execute(select(User).filter(User.email == user_login.email))).scalars().first()
+    if not user or not await run_in_threadpool(user.check_password, user_login.password):
         raise HTTPException(status_code=401, detail={
                             "message": "Invalid email or password", "status": 401})
 
@@ -135,11 +256,10 @@ def login_user(user_login: UserLogin):
 
 
 @app.get("/profile", response_model=UserProfileResponse, tags=["User"])
-def get_profile(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_profile(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     token = credentials.credentials
     user_id = decode_access_token(token)
-    db = next(get_db())
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).filter(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail={
                             "message": "User not found", "status": 404})
@@ -154,97 +274,362 @@ def get_profile(credentials: HTTPAuthorizationCredentials = Depends(security)):
 
 
 @app.get("/stock-info", response_model=dict, tags=["Stock"])
-def get_stock_info(ticker_symbol: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_stock_info(ticker_symbol: str, credentials: HTTPAuthorizationCredentials = Depends(security),
+                         engine: AsyncEngine = Depends(get_engine)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+
+    async def build():
+        try:
+            query = text("SELECT * FROM stock_info WHERE ticker = :ticker")
+            data = await read_sql_async(engine, query, {"ticker": ticker_symbol})
+            return json_response({"data": frame_payload(data), "message": "Stock info retrieved successfully",
+                                  "status": 200})
+        except Exception as e:
+            return {"message": f"Error retrieving stock info: {str(e)}", "status": 500}
+
+    return await cached_response(response_cache, data_versions, engine, "/stock-info", STOCK_INFO_SCOPE,
+                                 {"ticker_symbol": ticker_symbol}, build)
+
+
+@app.get("/stock-history", response_model=dict, tags=["Stock"])
+async def get_stock_history(request: Request, ticker_symbol: str, columns: Optional[str] = None,
+                            start: Optional[date] = None, end: Optional[date] = None, limit: Optional[int] = None,
+                            tail: Optional[int] = None, interval: str = "daily", orient: str = "records",
+                            stream: Optional[str] = None, accept: Optional[str] = Header(None), credentials: HTTPAuthorizationCredentials = Depends(security),
+                            engine: AsyncEngine = Depends(get_engine)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    if stream and stream not in STREAM_FORMATS:
+        return {"message": f"Unsupported stream format: {stream}", "status": 400}
+    if orient not in FRAME_ORIENTS:
+        return {"message": f"Unsupported orient: {orient}", "status": 400}
+    if interval not in HISTORY_INTERVALS:
+        return {"message": f"Unsupported interval: {interval}", "status": 400}
+    columns = [col.strip() for col in columns.split(",") if col.strip()] if columns else None
+
+    async def history_query():
+        # Reflecting the ticker table also rejects unknown tickers on the rollup path.
+        table_columns = await get_table_columns(engine, ticker_symbol)
+        if interval != "daily":
+            return build_bars_query(ticker_symbol, interval, columns, start, end, limit, tail)
+        return build_history_query(ticker_symbol, table_columns, columns, start, end, limit, tail)
+
+    if stream:
+        try:
+            query, params = await history_query()
+
+            async def chunks():
+                async with engine.connect() as conn:
+                    result = await conn.stream(query, params)
+                    async for rows in result.partitions(STREAM_CHUNK_SIZE):
+                        yield pd.DataFrame.from_records(rows, columns=list(result.keys()), coerce_float=True)
+
+            return StreamingResponse(stream_frames(chunks(), stream, "Stock data retrieved successfully"),
+                                     media_type=stream_media_type(stream))
+        except Exception as e:
+            return {"message": f"Error retrieving stock data: {str(e)}", "status": 500}
+
+    media_type = negotiate_columnar(accept)
+
+    async def build():
+        try:
+            query, params = await history_query()
+            data = await read_sql_async(engine, query, params)
+            if media_type:
+                return columnar_response(data, media_type)
+            return json_response({"data": frame_payload(data, orient), "message": "Stock data retrieved successfully",
+                                  "status": 200})
+        except Exception as e:
+            return {"message": f"Error retrieving stock data: {str(e)}", "status": 500}
+
+    cache_params = {"columns": ",".join(columns) if columns else None, "start": start, "end": end,
+                    "limit": limit, "tail": tail, "orient": orient, "media_type": media_type,
+                    "interval": interval if interval != "daily" else None}
+    validators = await history_validators(engine, ticker_symbol, cache_params)
+    if validators and is_not_modified(request, *validators):
+        return not_modified_response(*validators)
+    response = await cached_response(response_cache, data_versions, engine, "/stock-history",
+                                     history_scope(ticker_symbol), cache_params, build)
+    return with_validators(response, *validators) if validators else response
+
+
+@app.get("/stock-history/chart", response_model=dict, tags=["Stock"])
+async def get_stock_history_chart(request: Request, ticker_symbol: str, points: int = 500, mode: str = "lttb",
+                                  start: Optional[date] = None, end: Optional[date] = None, interval: str = "auto",
+                                  orient: str = "records",
+                                  credentials: HTTPAuthorizationCredentials = Depends(security),
+                                  engine: AsyncEngine = Depends(get_engine)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    if mode not in CHART_MODES:
+        return {"message": f"Unsupported mode: {mode}", "status": 400}
+    if orient not in FRAME_ORIENTS:
+        return {"message": f"Unsupported orient: {orient}", "status": 400}
+    if interval != "auto" and interval not in HISTORY_INTERVALS:
+        return {"message": f"Unsupported interval: {interval}", "status": 400}
+    if not 3 <= points <= CHART_MAX_POINTS:
+        return {"message": f"points must be between 3 and {CHART_MAX_POINTS}", "status": 400}
+
+    async def resolve_interval():
+        """Coarsest rollup with enough bars for points; daily when rollups are missing or too sparse."""
+        if interval != "auto":
+            return interval
+        try:
+            async with engine.connect() as conn:
+                rows = await conn.execute(*build_bar_counts_query(ticker_symbol, start, end))
+                return choose_interval(dict(rows.fetchall()), points)
+        except Exception:
+            return "daily"
+
+    async def build():
+        try:
+            source = await resolve_interval()
+            columns = ["Close"] if mode == "lttb" else ["Open", "High", "Low", "Close", "Volume"]
+            table_columns = await get_table_columns(engine, ticker_symbol)
+            if source == "daily":
+                query, params = build_history_query(ticker_symbol, table_columns, columns, start, end)
+            else:
+                query, params = build_bars_query(ticker_symbol, source, columns, start, end)
+            data = await read_sql_async(engine, query, params)
+            chart = lttb_frame(data, points) if mode == "lttb" else ohlc_frame(data, points)
+            return json_response({"data": frame_payload(chart, orient), "mode": mode, "interval": source,
+                                  "source_points": len(data), "message": "Stock chart data retrieved successfully",
+                                  "status": 200})
+        except ValueError as e:
+            return {"message": str(e), "status": 400}
+        except Exception as e:
+            return {"message": f"Error retrieving stock chart data: {str(e)}", "status": 500}
+
+    cache_params = {"points": points, "mode": mode, "start": start, "end": end, "interval": interval, "orient": orient}
+    validators = await history_validators(engine, ticker_symbol, {"chart": True, **cache_params})
+    if validators and is_not_modified(request, *validators):
+        return not_modified_response(*validators)
+    response = await cached_response(response_cache, data_versions, engine, "/stock-history/chart",
+                                     history_scope(ticker_symbol), cache_params, build)
+    return with_validators(response, *validators) if validators else response
+
+
+@app.post("/stock-info/batch", response_model=dict, tags=["Stock"])
+async def get_stock_info_batch(batch: BatchInfoRequest, credentials: HTTPAuthorizationCredentials = Depends(security),
+                               engine: AsyncEngine = Depends(get_engine)):
     token = credentials.credentials
     user_id = decode_access_token(token)
+    tickers = list(dict.fromkeys(batch.tickers))
+    if not tickers or len(tickers) > BATCH_MAX_TICKERS:
+        return {"message": f"Between 1 and {BATCH_MAX_TICKERS} tickers are required", "status": 400}
     try:
-        engine = create_engine(DATABASE_URL)
-        query = text("SELECT * FROM stock_info WHERE ticker = :ticker")
-        data = pd.read_sql_query(query, engine, params={
-                                 "ticker": ticker_symbol})
-        engine.dispose()
-        for col in data.select_dtypes(include=['datetime64']).columns:
-            data[col] = data[col].dt.strftime('%Y-%m-%d')
-        data_dict = data.to_dict(orient="records")
-        return {"data": data_dict, "message": "Stock info retrieved successfully", "status": 200}
+        query = text("SELECT * FROM stock_info WHERE ticker IN :tickers").bindparams(bindparam("tickers", expanding=True))
+        data = await read_sql_async(engine, query, {"tickers": tickers})
+        records = dict(zip(data["ticker"], frame_payload(data))) if not data.empty else {}
+        return json_response({
+            "data": {ticker: records[ticker] for ticker in tickers if ticker in records},
+            "missing": [ticker for ticker in tickers if ticker not in records],
+            "message": "Stock info retrieved successfully",
+            "status": 200
+        })
     except Exception as e:
         return {"message": f"Error retrieving stock info: {str(e)}", "status": 500}
 
 
-@app.get("/stock-history", response_model=dict, tags=["Stock"])
-def get_stock_history(ticker_symbol: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+@app.post("/stock-history/batch", response_model=dict, tags=["Stock"])
+async def get_stock_history_batch(batch: BatchHistoryRequest,
+                                  credentials: HTTPAuthorizationCredentials = Depends(security),
+                                  engine: AsyncEngine = Depends(get_engine)):
     token = credentials.credentials
     user_id = decode_access_token(token)
+    tickers = list(dict.fromkeys(batch.tickers))
+    if not tickers or len(tickers) > BATCH_MAX_TICKERS:
+        return {"message": f"Between 1 and {BATCH_MAX_TICKERS} tickers are required", "status": 400}
+    if batch.orient not in FRAME_ORIENTS:
+        return {"message": f"Unsupported orient: {batch.orient}", "status": 400}
     try:
-        engine = create_engine(DATABASE_URL)
-        query = f"SELECT * FROM \"{ticker_symbol}\""
-        data = pd.read_sql_query(text(query), engine)
-        engine.dispose()
-        for col in data.select_dtypes(include=['datetime64']).columns:
-            data[col] = data[col].dt.strftime('%Y-%m-%d')
-        data_dict = data.to_dict(orient="records")
-        return {"data": data_dict, "message": "Stock data retrieved successfully", "status": 200}
+        tables = await get_tables_columns(engine, tickers)
+        found = {ticker: tables[ticker] for ticker in tickers if ticker in tables}
+        data_dict = {}
+        dropped_columns = {}
+        if found and not batch.columns:
+            # Without a projection only the columns every table has are returned; report the rest.
+            shared = set(shared_columns(found))
+            dropped_columns = {ticker: [col for col in columns if col not in shared]
+                               for ticker, columns in found.items() if not set(columns) <= shared}
+        if found:
+            query, params = build_batch_history_query(found, batch.columns, batch.start, batch.end, batch.limit, batch.tail)
+            data = await read_sql_async(engine, query, params)
+            data_dict = {ticker: frame_payload(rows.drop(columns="ticker").reset_index(drop=True), batch.orient)
+                         for ticker, rows in data.groupby("ticker", sort=False)}
+        return json_response({
+            "data": {ticker: data_dict.get(ticker, [] if batch.orient == "records" else {}) for ticker in found},
+            "missing": [ticker for ticker in tickers if ticker not in found],
+            "dropped_columns": dropped_columns,
+            "message": "Stock data retrieved successfully",
+            "status": 200
+        })
+    except ValueError as e:
+        return {"message": str(e), "status": 400}
     except Exception as e:
         return {"message": f"Error retrieving stock data: {str(e)}", "status": 500}
 
-@app.get("/top-gainers-and-losers", response_model=dict, tags=["Stock"])
-def get_top_gainers_and_losers(n:int, credentials: HTTPAuthorizationCredentials = Depends(security)):
+
+@app.get("/stock-prices", response_model=dict, tags=["Stock"])
+async def get_stock_prices(ticker_symbols: str, start: Optional[date] = None, end: Optional[date] = None,
+                           accept: Optional[str] = Header(None),
+                           credentials: HTTPAuthorizationCredentials = Depends(security),
+                           engine: AsyncEngine = Depends(get_engine)):
     token = credentials.credentials
     user_id = decode_access_token(token)
     try:
-        engine = create_engine(DATABASE_URL)
-        query1 = text("SELECT * FROM percentage_change ORDER BY percentage_change DESC LIMIT :n")
-        top_gainers = pd.read_sql_query(query1, engine, params={
-                                 "n": n})
-        query2 = text("SELECT * FROM percentage_change ORDER BY percentage_change ASC LIMIT :n")
-        top_losers = pd.read_sql_query(query2, engine, params={
-                                 "n": n})
-        engine.dispose()
-        top_gainers_list = top_gainers.to_dict(orient="records")
-        top_losers_list = top_losers.to_dict(orient="records")
+        tickers = [ticker.strip() for ticker in ticker_symbols.split(",") if ticker.strip()]
+        conditions = ["ticker IN :tickers"]
+        params = {"tickers": tickers}
+        if start:
+            conditions.append("date >= :start")
+            params["start"] = start
+        if end:
+            conditions.append("date <= :end")
+            params["end"] = end
+        query = text(
+            "SELECT ticker, date, open, high, low, close, volume FROM prices WHERE "
+            + " AND ".join(conditions) + " ORDER BY ticker, date"
+        ).bindparams(bindparam("tickers", expanding=True))
+        data = await read_sql_async(engine, query, params)
+        media_type = negotiate_columnar(accept)
+        if media_type:
+            data['date'] = pd.to_datetime(data['date']).dt.date
+            return columnar_response(data, media_type)
+        data['date'] = pd.to_datetime(data['date'])
+        data_dict = {ticker: frame_payload(rows.drop(columns="ticker"))
+                     for ticker, rows in data.groupby("ticker")}
+        return json_response({"data": data_dict, "message": "Stock prices retrieved successfully", "status": 200})
+    except Exception as e:
+        return {"message": f"Error retrieving stock prices: {str(e)}", "status": 500}
+
+
+@app.get("/performance-snapshot", response_model=dict, tags=["Stock"])
+async def get_performance_snapshot(ticker_symbol: Optional[str] = None,
+                                   credentials: HTTPAuthorizationCredentials = Depends(security),
+                                   engine: AsyncEngine = Depends(get_engine)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    try:
+        if ticker_symbol:
+            query = text("SELECT * FROM performance_snapshot WHERE ticker = :ticker")
+            data = await read_sql_async(engine, query, {"ticker": ticker_symbol})
+        else:
+            data = await read_sql_async(engine, text("SELECT * FROM performance_snapshot ORDER BY ticker"))
+        data['latest_date'] = pd.to_datetime(data['latest_date'])
+        return json_response({"data": frame_payload(data), "message": "Performance snapshot retrieved successfully",
+                              "status": 200})
+    except Exception as e:
+        return {"message": f"Error retrieving performance snapshot: {str(e)}", "status": 500}
+
+
+@app.get("/universe-returns", response_model=dict, tags=["Stock"])
+def get_universe_returns(days: int = 30, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    try:
+        matrix = open_price_matrix()
+        close = matrix["close"]
+        base_row = matrix.row_at_or_before(matrix.dates[-1] - np.timedelta64(days, "D"))
+        if base_row < 0:
+            return {"message": f"Not enough history for {days} days", "status": 400}
+        latest = close[-1]
+        base = close[base_row]
+        returns = (latest / base - 1) * 100
+        data = [
+            {"ticker": ticker, "current_price": float(latest[i]), "base_price": float(base[i]),
+             "percentage_change": float(returns[i])}
+            for i, ticker in enumerate(matrix.tickers) if np.isfinite(returns[i])
+        ]
         return {
-            "top_gainers": top_gainers_list,
-            "top_losers": top_losers_list,
-            "message": "Top gainers and losers retrieved successfully",
+            "data": data,
+            "as_of": str(matrix.dates[-1]),
+            "base_date": str(matrix.dates[base_row]),
+            "message": "Universe returns retrieved successfully",
             "status": 200
         }
     except Exception as e:
-        return {"message": f"Error retrieving top gainers and losers: {str(e)}", "status": 500}
+        return {"message": f"Error retrieving universe returns: {str(e)}", "status": 500}
+
+
+@app.get("/top-gainers-and-losers", response_model=dict, tags=["Stock"])
+async def get_top_gainers_and_losers(request: Request, n:int,
+                                     credentials: HTTPAuthorizationCredentials = Depends(security),
+                                     engine: AsyncEngine = Depends(get_engine)):
+    token = credentials.credentials
+    user_id = decode_access_token(token)
+    validators = await version_validators(engine, "/top-gainers-and-losers", TOP_GAINERS_LOSERS_SCOPE, {"n": n})
+    if validators and is_not_modified(request, *validators):
+        return not_modified_response(*validators)
+
+    async def build():
+        try:
+            query1 = text("SELECT * FROM percentage_change ORDER BY percentage_change DESC LIMIT :n")
+            query2 = text("SELECT * FROM percentage_change ORDER BY percentage_change ASC LIMIT :n")
+            top_gainers, top_losers = await asyncio.gather(read_sql_async(engine, query1, {"n": n}),
+                                                           read_sql_async(engine, query2, {"n": n}))
+            return json_response({
+                "top_gainers": frame_payload(top_gainers),
+                "top_losers": frame_payload(top_losers),
+                "message": "Top gainers and losers retrieved successfully",
+                "status": 200
+            })
+        except Exception as e:
+            return {"message": f"Error retrieving top gainers and losers: {str(e)}", "status": 500}
+
+    response = await cached_response(response_cache, data_versions, engine, "/top-gainers-and-losers",
+                                     TOP_GAINERS_LOSERS_SCOPE, {"n": n}, build)
+    return with_validators(response, *validators) if validators else response
 
 
 @app.get("/all-news", response_model=dict, tags=["News"])
-def get_all_news(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_all_news(limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[str] = None,
+                       stream: Optional[str] = None, credentials: HTTPAuthorizationCredentials = Depends(security),
+                       collection: AsyncCollection = Depends(get_news_collection)):
     token = credentials.credentials
     user_id = decode_access_token(token)
+    if stream and stream not in STREAM_FORMATS:
+        return {"message": f"Unsupported stream format: {stream}", "status": 400}
     try:
-        client = MongoClient(MONGO_DB_URL)
-        db = client["stock_news"]
-        collection = db["articles"]
-        data = collection.find().sort('published_date', -1)
-        data = list(data)
-        for article in data:
-            article['_id'] = str(article['_id']) 
-            article['published_date'] = article['published_date'].strftime('%Y-%m-%d %H:%M:%S') if 'published_date' in article else None
-        client.close()
-        return {"data": data, "message": "News retrieved successfully", "status": 200}
+        if stream:
+            query = build_news_filter(cursor=cursor)
+            projection = parse_fields(fields)
+            max_documents = get_page_size(limit) if limit is not None else 0
+
+            async def articles():
+                documents = collection.find(query, projection).sort(NEWS_SORT).limit(max_documents).batch_size(STREAM_CHUNK_SIZE)
+                async for article in documents:
+                    yield serialize_article(article)
+
+            return StreamingResponse(stream_documents(articles(), stream, "News retrieved successfully"),
+                                     media_type=stream_media_type(stream))
+        data, next_cursor = await fetch_news_page(collection, cursor=cursor, limit=limit, fields=fields)
+        return {"data": data, "next_cursor": next_cursor, "message": "News retrieved successfully", "status": 200}
+    except ValueError as e:
+        return {"message": str(e), "status": 400}
     except Exception as e:
         return {"message": f"Error retrieving news: {str(e)}", "status": 500}
 
 
 @app.get("/news-by-ticker", response_model=dict, tags=["News"])
-def get_news_by_ticker(ticker_symbol: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_news_by_ticker(request: Request, ticker_symbol: str, limit: Optional[int] = None,
+                             cursor: Optional[str] = None, fields: Optional[str] = None,
+                             credentials: HTTPAuthorizationCredentials = Depends(security),
+                             collection: AsyncCollection = Depends(get_news_collection)):
     token = credentials.credentials
     user_id = decode_access_token(token)
     try:
-        client = MongoClient(MONGO_DB_URL)
-        db = client["stock_news"]
-        collection = db["articles"]
-        data = collection.find({"company": ticker_symbol}).sort('published_date', -1)
-        data = list(data)
-        for article in data:
-            article['_id'] = str(article['_id']) 
-            article['published_date'] = article['published_date'].strftime('%Y-%m-%d %H:%M:%S') if 'published_date' in article else None
-        client.close()
-        return {"data": data, "message": "News by ticker retrieved successfully", "status": 200}
+        data, next_cursor = await fetch_news_page(collection, {"company": ticker_symbol}, cursor=cursor, limit=limit, fields=fields)
+        response = json_response({"data": data, "next_cursor": next_cursor,
+                                  "message": "News by ticker retrieved successfully", "status": 200})
+        # Articles carry no modification time, so the ETag is taken from the page
+        # itself; this also catches edited and backfilled articles.
+        etag = make_etag("/news-by-ticker", response.body)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        return with_validators(response, etag)
+    except ValueError as e:
+        return {"message": str(e), "status": 400}
     except Exception as e:
         return {"message": f"Error retrieving news by ticker: {str(e)}", "status": 500}
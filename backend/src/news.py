@@ -0,0 +1,110 @@
+import base64
+import json
+import os
+import re
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+
+load_dotenv()
+
+NEWS_PAGE_SIZE = int(os.environ.get("NEWS_PAGE_SIZE", 50))
+NEWS_MAX_PAGE_SIZE = int(os.environ.get("NEWS_MAX_PAGE_SIZE", 500))
+
+# Keyset order: newest first, _id breaks ties between articles published at the same instant.
+NEWS_SORT = [("published_date", -1), ("_id", -1)]
+
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def get_page_size(limit: int = None):
+    if limit is None:
+        return NEWS_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, NEWS_MAX_PAGE_SIZE)
+
+
+def encode_cursor(article: dict):
+    """Opaque cursor pointing just past ``article`` in NEWS_SORT order."""
+    published = article.get("published_date")
+    payload = {
+        "d": published.isoformat() if isinstance(published, datetime) else None,
+        "i": str(article["_id"]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        published = datetime.fromisoformat(payload["d"]) if payload["d"] is not None else None
+        return published, ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def build_news_filter(base: dict = None, cursor: str = None):
+    """
+    Add the keyset condition for ``cursor`` to ``base``: everything strictly
+    older than the cursor, or published at the same time with a smaller _id.
+    Undated articles sort after every dated one, and $lt never matches null,
+    so they are added explicitly.
+    """
+    query = dict(base or {})
+    if not cursor:
+        return query
+    published, article_id = decode_cursor(cursor)
+    if published is None:
+        # Articles without a published_date sort last; only the _id tie-break remains.
+        query["published_date"] = None
+        query["_id"] = {"$lt": article_id}
+        return query
+    query["$or"] = [
+        {"published_date": {"$lt": published}},
+        {"published_date": published, "_id": {"$lt": article_id}},
+        {"published_date": None},
+    ]
+    return query
+
+
+def parse_fields(fields: str = None):
+    """
+    Turn a comma separated ``fields`` parameter into a Mongo projection.
+    published_date and _id are always returned because the cursor is built from them.
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    invalid = [name for name in names if not FIELD_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid fields: {', '.join(invalid)}")
+    projection = {name: 1 for name in names}
+    projection["published_date"] = 1
+    projection["_id"] = 1
+    return projection
+
+
+def serialize_article(article: dict):
+    article['_id'] = str(article['_id'])
+    article['published_date'] = article['published_date'].strftime('%Y-%m-%d %H:%M:%S') if article.get('published_date') else None
+    return article
+
+
+async def fetch_news_page(collection, base: dict = None, cursor: str = None, limit: int = None, fields: str = None):
+    """
+    Return one page of articles and the cursor for the next page, or None when
+    this page is the last one. One extra document is read to detect the end.
+    """
+    page_size = get_page_size(limit)
+    documents = await (
+        collection.find(build_news_filter(base, cursor), parse_fields(fields))
+        .sort(NEWS_SORT)
+        .limit(page_size + 1)
+        .to_list(None)
+    )
+    next_cursor = encode_cursor(documents[page_size - 1]) if len(documents) > page_size else None
+    return [serialize_article(article) for article in documents[:page_size]], next_cursor
@@ -0,0 +1,52 @@
+import os
+import json
+import numpy as np
+
+# Read side of the price matrix written by data-generation-ms
+# (src/price_matrix.py there). PRICE_MATRIX_PATH must point at the same
+# directory.
+
+
+class PriceMatrix:
+    """Read-only memory-mapped view of one price matrix version."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "index.json"), 'r') as f:
+            header = json.load(f)
+
+        self.version = header["version"]
+        self.tickers = header["tickers"]
+        self.dates = np.array(header["dates"], dtype="datetime64[D]")
+        self.fields = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+            for field in header["fields"]
+        }
+        self._columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def __getitem__(self, field: str):
+        return self.fields[field]
+
+    def column(self, field: str, ticker: str):
+        return self.fields[field][:, self._columns[ticker]]
+
+    def row_at_or_before(self, date):
+        return int(np.searchsorted(self.dates, np.datetime64(date, "D"), side="right")) - 1
+
+
+_open_matrices = {}
+
+
+def open_price_matrix(root: str = None):
+    """Map the current version, reusing the mapping until ingestion swaps it."""
+    root = root or os.environ.get("PRICE_MATRIX_PATH")
+    if not root:
+        raise ValueError("PRICE_MATRIX_PATH environment variable is not set")
+
+    with open(os.path.join(root, "CURRENT"), 'r') as f:
+        version = f.read().strip()
+
+    matrix = _open_matrices.get(root)
+    if matrix is None or matrix.version != version:
+        matrix = PriceMatrix(os.path.join(root, version))
+        _open_matrices[root] = matrix
+    return matrix
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import quote
+from dotenv import load_dotenv
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+load_dotenv()
+
+# Must match the scopes data-generation-ms bumps in src/data_versions.py.
+STOCK_INFO_SCOPE = "stock_info"
+TOP_GAINERS_LOSERS_SCOPE = "top_gainers_losers"
+
+
+def history_scope(ticker: str):
+    return f"history:{ticker}"
+
+
+class DataVersions:
+    """
+    In-memory copy of the data_versions table that ingestion bumps, reloaded
+    at most every ttl seconds so cache lookups do not cost a query each.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.environ.get("DATA_VERSION_TTL_SECONDS", 5))
+        self._versions = None
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, engine, scope: str):
+        """Version of scope, 0 if it was never bumped, or None when versions are unavailable."""
+        entry = await self.get_entry(engine, scope)
+        return entry[0] if entry is not None else None
+
+    async def get_entry(self, engine, scope: str):
+        """(version, updated_at) of scope, (0, None) if it was never bumped, None when unavailable."""
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self._reload(engine)
+        if self._versions is None:
+            return None
+        return self._versions.get(scope, (0, None))
+
+    def _is_stale(self):
+        # Failed loads count too, so an unreachable table is retried once per ttl, not per request.
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _reload(self, engine):
+        try:
+            async with engine.connect() as conn:
+                rows = await conn.execute(text("SELECT scope, version, updated_at FROM data_versions"))
+                self._versions = {scope: (version, updated_at) for scope, version, updated_at in rows.fetchall()}
+        except Exception as e:
+            # Without versions nothing can be cached safely.
+            print(f"Error loading data versions: {str(e)}")
+            self._versions = None
+        self._loaded_at = time.monotonic()
+
+    def expire(self):
+        self._loaded_at = None
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of serialized responses.
+
+    Keys carry the data version, so entries written before an ingestion run are
+    never served afterwards and simply age out. When directory is set, entries
+    are also written there so workers on the same host share them; writing a
+    new version of a scope removes the older versions' files.
+    """
+
+    def __init__(self, max_bytes: int = None, max_entries: int = None, directory: Optional[str] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 10000))
+        self.directory = directory if directory is not None else os.environ.get("RESPONSE_CACHE_DIR")
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, scope: str, version: int, params: dict):
+        return (endpoint, scope, version, tuple(sorted((k, str(v)) for k, v in params.items() if v is not None)))
+
+    def _scope_dir(self, endpoint, scope):
+        return os.path.join(self.directory, quote(endpoint, safe=""), quote(scope, safe=""))
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self._scope_dir(key[0], key[1]), str(key[2]), digest)
+
+    async def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        if self.directory:
+            entry = await asyncio.to_thread(self._read_shared, key)
+            if entry is not None:
+                self._store(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def put(self, key, body: bytes, media_type: str):
+        entry = (body, media_type)
+        self._store(key, entry)
+        if self.directory:
+            # File I/O on a worker thread so slow disks do not stall the event loop.
+            await asyncio.to_thread(self._write_shared, key, entry)
+
+    def _store(self, key, entry):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[0])
+
+    def _read_shared(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                media_type, body = f.read().split(b"\n", 1)
+            return body, media_type.decode()
+        except (OSError, ValueError):
+            return None
+
+    def _write_shared(self, key, entry):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(entry[1].encode() + b"\n" + entry[0])
+            os.replace(tmp_path, path)
+            scope_dir = self._scope_dir(key[0], key[1])
+            for version in os.listdir(scope_dir):
+                if version != str(key[2]):
+                    shutil.rmtree(os.path.join(scope_dir, version), ignore_errors=True)
+        except OSError as e:
+            print(f"Error writing shared response cache: {str(e)}")
+
+    def invalidate(self, endpoint: Optional[str] = None, scope: Optional[str] = None):
+        """Drop entries for an endpoint and/or scope; everything when neither is given."""
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (endpoint is None or key[0] == endpoint) and (scope is None or key[1] == scope)]
+            for key in keys:
+                self._size -= len(self._entries.pop(key)[0])
+        if self.directory:
+            self._invalidate_shared(endpoint, scope)
+        return len(keys)
+
+    def _invalidate_shared(self, endpoint, scope):
+        if not os.path.isdir(self.directory):
+            return
+        endpoints = [quote(endpoint, safe="")] if endpoint else os.listdir(self.directory)
+        for name in endpoints:
+            target = os.path.join(self.directory, name)
+            if scope:
+                target = os.path.join(target, quote(scope, safe=""))
+            shutil.rmtree(target, ignore_errors=True)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                    "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses,
+                    "shared_directory": self.directory}
+
+
+async def cached_response(cache: ResponseCache, versions: DataVersions, engine, endpoint: str, scope: str,
+                          params: dict, build):
+    """
+    Serve endpoint from cache, or await build() and cache its serialized body.
+
+    build may return a dict, which is encoded the way FastAPI would encode it,
+    or a Response. Only successful responses are cached.
+    """
+    version = await versions.get(engine, scope)
+    if version is None:
+        return await build()
+
+    key = cache.make_key(endpoint, scope, version, params)
+    entry = await cache.get(key)
+    if entry is not None:
+        return Response(content=entry[0], media_type=entry[1])
+
+    response = await build()
+    if isinstance(response, dict):
+        if response.get("status") != 200:
+            return response
+        response = JSONResponse(content=jsonable_encoder(response))
+    if response.status_code == 200:
+        await cache.put(key, response.body, response.media_type)
+    return response
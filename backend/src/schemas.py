@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
+from typing import List, Optional
 
 class UserCreate(BaseModel):
     name: str
@@ -26,4 +27,16 @@ class TokenResponse(BaseModel):
     token: str
     user: UserResponse
     message: str
-    status: int 
\ No newline at end of file
+    status: int 
+
+class BatchHistoryRequest(BaseModel):
+    tickers: List[str]
+    columns: Optional[List[str]] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+    limit: Optional[int] = None
+    tail: Optional[int] = None
+    orient: str = "records"
+
+class BatchInfoRequest(BaseModel):
+    tickers: List[str]
@@ -0,0 +1,52 @@
+import json
+from src.frame_json import dumps, frame_payload
+
+STREAM_CHUNK_SIZE = 500
+
+STREAM_FORMATS = ("ndjson", "json")
+
+
+async def stream_frames(chunks, stream_format: str, message: str):
+    """
+    Encode DataFrame chunks from an async iterable as they arrive.
+
+    "ndjson" emits one record per line. "json" emits the usual
+    {"data": [...], "message": ..., "status": 200} envelope as a chunked
+    array.
+    """
+    if stream_format == "ndjson":
+        async for chunk in chunks:
+            if not chunk.empty:
+                yield b"".join(dumps(record) + b"\n" for record in frame_payload(chunk))
+        return
+
+    yield "{\"data\":["
+    first = True
+    async for chunk in chunks:
+        if chunk.empty:
+            continue
+        # Same encoder as the non-streamed responses, so values match byte for byte.
+        records = dumps(frame_payload(chunk)).decode()[1:-1]
+        yield records if first else "," + records
+        first = False
+    yield "]," + json.dumps({"message": message, "status": 200}, separators=(",", ":"))[1:]
+
+
+async def stream_documents(documents, stream_format: str, message: str):
+    """Same as stream_frames for an async iterable of JSON-ready dicts."""
+    if stream_format == "ndjson":
+        async for document in documents:
+            yield json.dumps(document, default=str, separators=(",", ":")) + "\n"
+        return
+
+    yield "{\"data\":["
+    first = True
+    async for document in documents:
+        encoded = json.dumps(document, default=str, separators=(",", ":"))
+        yield encoded if first else "," + encoded
+        first = False
+    yield "]," + json.dumps({"message": message, "status": 200}, separators=(",", ":"))[1:]
+
+
+def stream_media_type(stream_format: str):
+    return "application/x-ndjson" if stream_format == "ndjson" else "application/json"
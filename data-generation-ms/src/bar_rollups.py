@@ -0,0 +1,91 @@
+import pandas as pd
+from sqlalchemy import text
+from src.bulk_writer import copy_frame
+
+BAR_ROLLUPS_TABLE = "price_bars"
+
+# Tier name -> pandas period; bars are keyed by the first calendar day of the period.
+ROLLUP_PERIODS = {"weekly": "W-SUN", "monthly": "M"}
+
+BAR_ROLLUPS_DDL = """
+CREATE TABLE IF NOT EXISTS price_bars (
+    ticker VARCHAR(32) NOT NULL,
+    period VARCHAR(16) NOT NULL,
+    date DATE NOT NULL,
+    last_date DATE NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume BIGINT,
+    bar_count INTEGER NOT NULL,
+    PRIMARY KEY (ticker, period, date)
+)
+"""
+
+
+def ensure_bar_rollups_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(BAR_ROLLUPS_DDL))
+
+
+def period_start(day, period: str):
+    """First calendar day of the rollup period containing day."""
+    return pd.Period(day, freq=ROLLUP_PERIODS[period]).start_time.date()
+
+
+def rollup_bars(ticker: str, data: pd.DataFrame, period: str):
+    """
+    Aggregate daily price rows (date, open, high, low, close, volume) into
+    one OHLCV bar per period: first open, highest high, lowest low, last
+    close and summed volume.
+    """
+    data = data.dropna(subset=["close"]).sort_values("date")
+    dates = pd.to_datetime(data["date"])
+    keys = dates.dt.to_period(ROLLUP_PERIODS[period]).dt.start_time.dt.date
+    bars = data.assign(last_date=dates.dt.date).groupby(keys.to_numpy(), sort=True).agg(
+        last_date=("last_date", "last"), open=("open", "first"), high=("high", "max"), low=("low", "min"),
+        close=("close", "last"), volume=("volume", "sum"), bar_count=("close", "size"),
+    )
+    bars.index.name = "date"
+    bars = bars.reset_index()
+    bars.insert(0, "period", period)
+    bars.insert(0, "ticker", ticker)
+    bars["volume"] = bars["volume"].round().astype("Int64")
+    return bars
+
+
+def _rollups_cover_prices(ticker: str, period: str, conn):
+    """Whether the ticker's bars for period start at its first daily row, i.e. history was rolled up in full."""
+    first_price = conn.execute(text("SELECT MIN(date) FROM prices WHERE ticker = :ticker"), {"ticker": ticker}).scalar()
+    first_bar = conn.execute(text("SELECT MIN(date) FROM price_bars WHERE ticker = :ticker AND period = :period"),
+                             {"ticker": ticker, "period": period}).scalar()
+    if first_price is None:
+        return True
+    return first_bar is not None and pd.Timestamp(first_bar).date() <= period_start(first_price, period)
+
+
+def write_bar_rollups(ticker: str, conn, since=None):
+    """
+    Rebuild the ticker's weekly and monthly bars from the prices table.
+
+    With since, only periods from the one containing since onwards are
+    recomputed, so an incremental append touches the last bar or two; the
+    daily rows must already be written on conn. A ticker whose rollups do
+    not reach back to its first daily row (e.g. one ingested before
+    rollups existed) is rebuilt in full instead, so no backfill step is
+    needed.
+    """
+    for period in ROLLUP_PERIODS:
+        params = {"ticker": ticker}
+        condition = ""
+        if since is not None and _rollups_cover_prices(ticker, period, conn):
+            params["start"] = period_start(since, period)
+            condition = " AND date >= :start"
+        daily = pd.read_sql_query(
+            text(f"SELECT date, open, high, low, close, volume FROM prices WHERE ticker = :ticker{condition}"),
+            conn, params=params)
+        conn.execute(text(f"DELETE FROM price_bars WHERE ticker = :ticker AND period = :period{condition}"),
+                     {**params, "period": period})
+        if not daily.empty:
+            copy_frame(rollup_bars(ticker, daily, period), BAR_ROLLUPS_TABLE, conn)
@@ -0,0 +1,51 @@
+import io
+import pandas as pd
+from sqlalchemy import text
+
+
+def copy_frame(data: pd.DataFrame, table: str, conn):
+    """
+    Append data to an existing table on an open connection.
+
+    Postgres gets a single COPY FROM STDIN stream; other databases (SQLite
+    for local testing) fall back to pandas' executemany inserts.
+    """
+    if conn.dialect.name != "postgresql":
+        data.to_sql(table, conn, if_exists='append', index=False)
+        return
+
+    buffer = io.StringIO()
+    data.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+
+    columns = ", ".join(f"\"{col}\"" for col in data.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY \"{table}\" ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def replace_table(data: pd.DataFrame, table: str, engine, indexes: dict = None, before_commit=None):
+    """
+    Load data into a staging table and swap it in place of table.
+
+    Readers keep seeing the old table until the transaction commits.
+    indexes maps index name to column list; they are rebuilt on the staging
+    table, since dropping the old table drops its indexes with it.
+    before_commit(conn) runs after the swap in the same transaction, for
+    writes that must become visible together with the new table.
+    """
+    staging = f"{table}_staging"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS \"{staging}\""))
+        data.head(0).to_sql(staging, conn, index=False)
+        copy_frame(data, staging, conn)
+        conn.execute(text(f"DROP TABLE IF EXISTS \"{table}\""))
+        for name, columns in (indexes or {}).items():
+            column_list = ", ".join(f"\"{col}\"" for col in columns)
+            conn.execute(text(f"CREATE INDEX \"{name}\" ON \"{staging}\" ({column_list})"))
+        conn.execute(text(f"ALTER TABLE \"{staging}\" RENAME TO \"{table}\""))
+        if before_commit is not None:
+            before_commit(conn)
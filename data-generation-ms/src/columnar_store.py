@@ -0,0 +1,106 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+# Roughly one year of daily bars per row group, so date filters can skip
+# whole row groups using the Date min/max statistics.
+ROW_GROUP_SIZE = 256
+
+PARTITIONING = ds.partitioning(pa.schema([("ticker", pa.string())]), flavor="hive")
+
+
+def get_store_path():
+    """Root of the Parquet store, or None when COLUMNAR_STORE_PATH is unset."""
+    load_dotenv()
+    return os.environ.get("COLUMNAR_STORE_PATH") or None
+
+
+def _ticker_dir(root: str, ticker: str):
+    return os.path.join(root, f"ticker={ticker}")
+
+
+def has_ticker(ticker: str, root: str = None):
+    root = root or get_store_path()
+    return root is not None and os.path.exists(os.path.join(_ticker_dir(root, ticker), "data.parquet"))
+
+
+def columnar_columns(ticker: str, root: str = None):
+    """Column names of the ticker's partition, read from the Parquet footer only."""
+    root = root or get_store_path()
+    return pq.read_schema(os.path.join(_ticker_dir(root, ticker), "data.parquet")).names
+
+
+def write_columnar(ticker: str, data: pd.DataFrame, root: str = None):
+    """Atomically replace the ticker's partition with data."""
+    root = root or get_store_path()
+    if root is None:
+        return
+
+    directory = _ticker_dir(root, ticker)
+    os.makedirs(directory, exist_ok=True)
+
+    data = data.sort_values("Date").reset_index(drop=True)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+
+    # Dot-prefixed so dataset discovery in read_columnar never picks up a
+    # half-written or abandoned temp file.
+    tmp_path = os.path.join(directory, ".data.parquet.tmp")
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression="zstd")
+    os.replace(tmp_path, os.path.join(directory, "data.parquet"))
+
+
+def append_columnar(ticker: str, data: pd.DataFrame, since, root: str = None):
+    """
+    Replace the ticker's rows from since onwards with data.
+
+    Returns False when the partition is missing or its columns differ, in
+    which case the caller has to rewrite the full history.
+    """
+    root = root or get_store_path()
+    if root is None:
+        return True
+
+    if not has_ticker(ticker, root):
+        return False
+
+    stored = pq.read_table(os.path.join(_ticker_dir(root, ticker), "data.parquet")).to_pandas()
+    if set(stored.columns) != set(data.columns):
+        return False
+
+    stored = stored[stored["Date"] < since]
+    write_columnar(ticker, pd.concat([stored, data[stored.columns]], ignore_index=True), root)
+    return True
+
+
+def read_columnar(tickers: list = None, columns: list = None, start=None, end=None, root: str = None):
+    """
+    Read rows for tickers from the Parquet store.
+
+    Only the requested columns are decoded, and row groups outside
+    [start, end] are skipped using their Date statistics.
+    """
+    root = root or get_store_path()
+    if root is None:
+        raise ValueError("COLUMNAR_STORE_PATH environment variable is not set")
+
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+    expression = None
+    conditions = []
+    if tickers:
+        conditions.append(ds.field("ticker").isin(tickers))
+    if start is not None:
+        conditions.append(ds.field("Date") >= pd.Timestamp(start).date())
+    if end is not None:
+        conditions.append(ds.field("Date") <= pd.Timestamp(end).date())
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    if columns is not None:
+        columns = list(dict.fromkeys(["ticker", "Date", *columns]))
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas().sort_values(["ticker", "Date"]).reset_index(drop=True)
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+DATA_VERSIONS_TABLE = "data_versions"
+
+DATA_VERSIONS_DDL = """
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP
+)
+"""
+
+# Scopes the backend keys its response cache on.
+STOCK_INFO_SCOPE = "stock_info"
+TOP_GAINERS_LOSERS_SCOPE = "top_gainers_losers"
+
+
+def history_scope(ticker: str):
+    return f"history:{ticker}"
+
+
+def ensure_data_versions_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(DATA_VERSIONS_DDL))
+
+
+def bump_data_version(conn, *scopes):
+    """
+    Increment the version of each scope on an open connection, so the bump
+    commits together with the write it describes.
+    """
+    for scope in scopes:
+        conn.execute(text(
+            "INSERT INTO data_versions (scope, version, updated_at) VALUES (:scope, 1, :now) "
+            "ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1, updated_at = :now"
+        ), {"scope": scope, "now": datetime.now(timezone.utc).replace(tzinfo=None)})
@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+
+def get_database_url():
+    load_dotenv()
+
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    return DATABASE_URL
+
+
+def get_engine():
+    return create_engine(get_database_url())
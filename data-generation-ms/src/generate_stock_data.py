@@ -1,43 +1,276 @@
 import yfinance as yf
 import pandas as pd
-import ta
-from sqlalchemy import create_engine
 import os
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from src.bar_rollups import ensure_bar_rollups_table, write_bar_rollups
+from src.bulk_writer import copy_frame, replace_table
+from src.data_versions import bump_data_version, ensure_data_versions_table, history_scope
+from src.columnar_store import append_columnar, get_store_path, write_columnar
+from src.database import get_engine
+from src.indicators import (
+    IndicatorSchemaChanged, add_indicators, add_indicators_tail, get_indicator_config, get_seed_window
+)
+from src.performance_snapshot import refresh_performance_snapshot
+from src.price_matrix import build_price_matrix
+from src.prices_store import append_prices, ensure_prices_table, write_prices
 
+# yf.download keeps its per-call results in module globals (shared._DFS,
+# shared._ERRORS) that every call resets, so concurrent calls clobber each
+# other. Downloads are serialized; each one still fetches its tickers in
+# parallel, and indicator and persistence work runs outside the lock.
+_DOWNLOAD_LOCK = threading.Lock()
 
-def generate_stock_data(ticker: str):
 
+def download_stock_data(tickers: list, period: str = "5y", start=None):
+    if start is not None:
+        window = {"start": start}
+    else:
+        window = {"period": period}
+
+    with _DOWNLOAD_LOCK:
+        data = yf.download(
+        tickers=tickers,
+        interval="1d",
+        auto_adjust=True,
+        prepost=True,
+        threads=True,
+        group_by="ticker",
+        **window
+        )
+
+    frames = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker].copy()
+        else:
+            frame = data.copy()
+
+        frame = frame.dropna(how="all")
+        if frame.empty:
+            continue
+
+        frame.reset_index(inplace=True)
+        frame.columns.name = None
+        frame['Date'] = pd.to_datetime(frame['Date']).dt.date
+        frames[ticker] = frame
+
+    return frames
+
+
+def get_overlap_days():
     load_dotenv()
-    
-    print(f"Generating data for {ticker}")
-    data = yf.download(
-    tickers=ticker, 
-    period="5y",
-    interval="1d", 
-    auto_adjust=True, 
-    prepost=True, 
-    threads=True
-    )
-
-    data.reset_index(inplace=True)
+    return int(os.environ.get("INCREMENTAL_OVERLAP_DAYS", 5))
+
+
+def get_last_stored_date(ticker: str, engine):
+    if not inspect(engine).has_table(ticker):
+        return None
+
+    with engine.connect() as conn:
+        last_date = conn.execute(text(f"SELECT MAX(\"Date\") FROM \"{ticker}\"")).scalar()
+
+    if last_date is None:
+        return None
+    return pd.to_datetime(last_date).date()
+
+
+def load_stored_bars(ticker: str, engine, before, limit: int):
+    query = f"SELECT * FROM \"{ticker}\" WHERE \"Date\" < :before ORDER BY \"Date\" DESC LIMIT :limit"
+    data = pd.read_sql_query(text(query), engine, params={"before": before, "limit": limit})
+    data = data.iloc[::-1].reset_index(drop=True)
     data['Date'] = pd.to_datetime(data['Date']).dt.date
-    data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+    return data
+
+
+def save_stock_data(ticker: str, data: pd.DataFrame, engine):
+    def write_derived(conn):
+        write_prices(ticker, data, conn)
+        write_bar_rollups(ticker, conn)
+        bump_data_version(conn, history_scope(ticker))
+
+    replace_table(data, ticker, engine, indexes={f"{ticker}_date_idx": ["Date"]}, before_commit=write_derived)
+    write_columnar(ticker, data)
+
+
+def append_stock_data(ticker: str, data: pd.DataFrame, engine, since):
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM \"{ticker}\" WHERE \"Date\" >= :since"), {"since": since})
+        copy_frame(data, ticker, conn)
+        append_prices(ticker, data, conn, since)
+        write_bar_rollups(ticker, conn, since)
+        bump_data_version(conn, history_scope(ticker))
+
+    if get_store_path() is not None and not append_columnar(ticker, data, since):
+        full = pd.read_sql_query(text(f"SELECT * FROM \"{ticker}\""), engine)
+        full['Date'] = pd.to_datetime(full['Date']).dt.date
+        write_columnar(ticker, full)
+
 
-    data = ta.add_all_ta_features(
-        df=data,
-        open="Open", high="High", low="Low", close="Close", volume="Volume",
-        fillna=True
-    )
+def update_stock_data(ticker: str, new_bars: pd.DataFrame, engine, since, specs=None):
+    new_bars = new_bars[new_bars['Date'] >= since]
+    if new_bars.empty:
+        return 0
+
+    stored = load_stored_bars(ticker, engine, since, get_seed_window(specs))
+    tail = add_indicators_tail(stored, new_bars, specs)
+    append_stock_data(ticker, tail, engine, since)
+    return len(tail)
+
+
+def _generate_ticker(ticker: str, engine, incremental: bool = True, specs=None):
+    last_date = get_last_stored_date(ticker, engine) if incremental else None
+
+    if last_date is not None:
+        since = last_date - timedelta(days=get_overlap_days())
+        frames = download_stock_data([ticker], start=since)
+        if ticker not in frames:
+            return
+        try:
+            update_stock_data(ticker, frames[ticker], engine, since, specs)
+            return
+        except IndicatorSchemaChanged:
+            print(f"Indicator config changed for {ticker}, rebuilding table")
+
+    frames = download_stock_data([ticker])
+    if ticker not in frames:
+        raise ValueError(f"No data returned for {ticker}")
+    save_stock_data(ticker, add_indicators(frames[ticker], specs), engine)
+
+
+def generate_stock_data(tickers: list, incremental: bool = True):
+    """
+    Generate tickers one at a time, then refresh the performance snapshot and
+    price matrix once for the ones that succeeded. Stops at the first error.
+    """
+    specs = get_indicator_config()
+    engine = get_engine()
+    processed = []
+
+    try:
+        ensure_prices_table(engine)
+        ensure_data_versions_table(engine)
+        ensure_bar_rollups_table(engine)
+        try:
+            for ticker in tickers:
+                print(f"Generating data for {ticker}")
+                _generate_ticker(ticker, engine, incremental, specs)
+                processed.append(ticker)
+        finally:
+            if processed:
+                refresh_performance_snapshot(engine, processed)
+                build_price_matrix(engine)
+    finally:
+        engine.dispose()
+
+
+def _record(job, ticker: str, error, started: float):
+    if job is not None:
+        job.record(ticker, error, time.perf_counter() - started)
+
+
+def _generate_batch(tickers: list, engine, incremental: bool = True, specs=None, job=None):
+    results = {}
+    if job is not None and job.is_cancelled():
+        return results
+
+    last_dates = {}
+    if incremental:
+        for ticker in tickers:
+            last_dates[ticker] = get_last_stored_date(ticker, engine)
+
+    full = [ticker for ticker in tickers if last_dates.get(ticker) is None]
+    partial = [ticker for ticker in tickers if last_dates.get(ticker) is not None]
+
+    if partial:
+        overlap = timedelta(days=get_overlap_days())
+        start = min(last_dates[ticker] for ticker in partial) - overlap
+        print(f"Downloading bars since {start} for {len(partial)} tickers: {', '.join(partial)}")
+        frames = download_stock_data(partial, start=start)
+        for ticker in partial:
+            if job is not None and job.is_cancelled():
+                return results
+            started = time.perf_counter()
+            try:
+                if ticker not in frames:
+                    raise ValueError("No data returned")
+                update_stock_data(ticker, frames[ticker], engine, last_dates[ticker] - overlap, specs)
+                results[ticker] = None
+            except IndicatorSchemaChanged:
+                print(f"Indicator config changed for {ticker}, rebuilding table")
+                full.append(ticker)
+                continue
+            except Exception as e:
+                results[ticker] = str(e)
+            _record(job, ticker, results[ticker], started)
+
+    if full:
+        if job is not None and job.is_cancelled():
+            return results
+        print(f"Downloading full history for {len(full)} tickers: {', '.join(full)}")
+        frames = download_stock_data(full)
+        for ticker in full:
+            if job is not None and job.is_cancelled():
+                return results
+            started = time.perf_counter()
+            try:
+                if ticker not in frames:
+                    raise ValueError("No data returned")
+                save_stock_data(ticker, add_indicators(frames[ticker], specs), engine)
+                results[ticker] = None
+            except Exception as e:
+                results[ticker] = str(e)
+            _record(job, ticker, results[ticker], started)
+
+    return results
+
+
+def generate_stock_data_batch(tickers: list, batch_size: int = None, max_workers: int = None,
+                              incremental: bool = True, job=None):
+    load_dotenv()
 
-    DATABASE_URL = os.environ.get("DATABASE_URL")
+    batch_size = batch_size or int(os.environ.get("DOWNLOAD_BATCH_SIZE", 20))
+    max_workers = max_workers or int(os.environ.get("INGESTION_WORKERS", 4))
 
-    if not DATABASE_URL:
-        raise ValueError("DATABASE_URL environment variable is not set")
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    print(f"Generating data for {len(tickers)} tickers in {len(batches)} batches")
 
-    engine = create_engine(DATABASE_URL)
-    data.to_sql(ticker, engine, if_exists='replace', index=False)
+    specs = get_indicator_config()
+    engine = get_engine()
+    processed = []
+    failed = {}
+    try:
+        ensure_prices_table(engine)
+        ensure_data_versions_table(engine)
+        ensure_bar_rollups_table(engine)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_generate_batch, batch, engine, incremental, specs, job): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = {ticker: str(e) for ticker in futures[future]}
+                    for ticker in futures[future]:
+                        if job is not None:
+                            job.record(ticker, str(e))
+                for ticker, error in results.items():
+                    if error:
+                        print(f"Error generating data for {ticker}: {error}")
+                        failed[ticker] = error
+                    else:
+                        processed.append(ticker)
 
-    engine.dispose()
+        if processed:
+            refresh_performance_snapshot(engine, processed)
+            build_price_matrix(engine)
+    finally:
+        engine.dispose()
 
-    
\ No newline at end of file
+    return {"processed": len(processed), "failed": failed}
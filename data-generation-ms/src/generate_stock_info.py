@@ -2,6 +2,8 @@ import pandas as pd
 from sqlalchemy import create_engine
 import os
 from dotenv import load_dotenv
+from src.bulk_writer import replace_table
+from src.data_versions import STOCK_INFO_SCOPE, bump_data_version, ensure_data_versions_table
 
 def generate_stock_info():
 
@@ -16,7 +18,9 @@ def generate_stock_info():
             raise ValueError("DATABASE_URL environment variable is not set")
 
         engine = create_engine(DATABASE_URL)
-        df.to_sql("stock_info", engine, if_exists='replace', index=False)
+        ensure_data_versions_table(engine)
+        replace_table(df, "stock_info", engine, indexes={"stock_info_ticker_idx": ["ticker"]},
+                      before_commit=lambda conn: bump_data_version(conn, STOCK_INFO_SCOPE))
 
         engine.dispose()
 
@@ -0,0 +1,233 @@
+import os
+import inspect
+import json
+from functools import lru_cache
+import pandas as pd
+import ta
+from ta.momentum import (
+    KAMAIndicator, ROCIndicator, RSIIndicator, StochasticOscillator, WilliamsRIndicator
+)
+from ta.others import CumulativeReturnIndicator, DailyReturnIndicator
+from ta.trend import (
+    ADXIndicator, CCIIndicator, EMAIndicator, MACD, SMAIndicator, WMAIndicator
+)
+from ta.volatility import AverageTrueRange, BollingerBands, DonchianChannel, KeltnerChannel
+from ta.volume import (
+    AccDistIndexIndicator, ChaikinMoneyFlowIndicator, MFIIndicator,
+    NegativeVolumeIndexIndicator, OnBalanceVolumeIndicator, VolumePriceTrendIndicator,
+    VolumeWeightedAveragePrice
+)
+from dotenv import load_dotenv
+
+OHLCV_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+class IndicatorSchemaChanged(ValueError):
+    pass
+
+
+INPUT_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+# Indicators that accumulate over the whole history. A seed window cannot
+# reproduce them, so the tail is re-anchored on the last stored value.
+ADDITIVE_COLUMNS = ["volume_adi", "volume_obv", "volume_vpt"]
+MULTIPLICATIVE_COLUMNS = ["volume_nvi"]
+CUMULATIVE_RETURN_COLUMNS = ["others_cr"]
+
+# Recursive (EMA/Wilder-smoothed) indicators only forget their starting
+# value geometrically, so their seed covers this many lookbacks; rolling
+# indicators need twice their lookback to cover chained windows.
+CONVERGENCE_FACTOR = 20
+ROLLING_FACTOR = 2
+
+# Longest recursive lookback among the ta.add_all_ta_features defaults
+# (the STC slow EMA).
+ALL_FEATURES_LOOKBACK = 50
+
+# Indicators that can be selected in the indicator config. "outputs" maps a
+# column suffix to the ta method producing it; the empty suffix is stored
+# under the configured name itself. "recursive" marks EMA-type smoothing.
+INDICATOR_REGISTRY = {
+    "sma": {"cls": SMAIndicator, "inputs": ["close"], "outputs": {"": "sma_indicator"}},
+    "ema": {"cls": EMAIndicator, "inputs": ["close"], "outputs": {"": "ema_indicator"}, "recursive": True},
+    "wma": {"cls": WMAIndicator, "inputs": ["close"], "outputs": {"": "wma"}},
+    "macd": {"cls": MACD, "inputs": ["close"],
+             "outputs": {"": "macd", "signal": "macd_signal", "diff": "macd_diff"}, "recursive": True},
+    "adx": {"cls": ADXIndicator, "inputs": ["high", "low", "close"],
+            "outputs": {"": "adx", "pos": "adx_pos", "neg": "adx_neg"}, "recursive": True},
+    "cci": {"cls": CCIIndicator, "inputs": ["high", "low", "close"], "outputs": {"": "cci"}},
+    "rsi": {"cls": RSIIndicator, "inputs": ["close"], "outputs": {"": "rsi"}, "recursive": True},
+    "stoch": {"cls": StochasticOscillator, "inputs": ["high", "low", "close"],
+              "outputs": {"": "stoch", "signal": "stoch_signal"}},
+    "williams_r": {"cls": WilliamsRIndicator, "inputs": ["high", "low", "close"],
+                   "outputs": {"": "williams_r"}, "params": {"lbp": 14}},
+    "roc": {"cls": ROCIndicator, "inputs": ["close"], "outputs": {"": "roc"}},
+    "kama": {"cls": KAMAIndicator, "inputs": ["close"], "outputs": {"": "kama"}, "recursive": True},
+    "bollinger": {"cls": BollingerBands, "inputs": ["close"],
+                  "outputs": {"mavg": "bollinger_mavg", "hband": "bollinger_hband",
+                              "lband": "bollinger_lband", "wband": "bollinger_wband",
+                              "pband": "bollinger_pband"}},
+    "keltner": {"cls": KeltnerChannel, "inputs": ["high", "low", "close"],
+                "outputs": {"mband": "keltner_channel_mband", "hband": "keltner_channel_hband",
+                            "lband": "keltner_channel_lband"}, "recursive": True},
+    "donchian": {"cls": DonchianChannel, "inputs": ["high", "low", "close"],
+                 "outputs": {"mband": "donchian_channel_mband", "hband": "donchian_channel_hband",
+                             "lband": "donchian_channel_lband"}},
+    "atr": {"cls": AverageTrueRange, "inputs": ["high", "low", "close"],
+            "outputs": {"": "average_true_range"}, "recursive": True},
+    "vwap": {"cls": VolumeWeightedAveragePrice, "inputs": ["high", "low", "close", "volume"],
+             "outputs": {"": "volume_weighted_average_price"}},
+    "mfi": {"cls": MFIIndicator, "inputs": ["high", "low", "close", "volume"],
+            "outputs": {"": "money_flow_index"}},
+    "cmf": {"cls": ChaikinMoneyFlowIndicator, "inputs": ["high", "low", "close", "volume"],
+            "outputs": {"": "chaikin_money_flow"}},
+    "obv": {"cls": OnBalanceVolumeIndicator, "inputs": ["close", "volume"],
+            "outputs": {"": "on_balance_volume"}, "anchor": "additive"},
+    "adi": {"cls": AccDistIndexIndicator, "inputs": ["high", "low", "close", "volume"],
+            "outputs": {"": "acc_dist_index"}, "anchor": "additive"},
+    "vpt": {"cls": VolumePriceTrendIndicator, "inputs": ["close", "volume"],
+            "outputs": {"": "volume_price_trend"}, "anchor": "additive"},
+    "nvi": {"cls": NegativeVolumeIndexIndicator, "inputs": ["close", "volume"],
+            "outputs": {"": "negative_volume_index"}, "anchor": "multiplicative"},
+    "daily_return": {"cls": DailyReturnIndicator, "inputs": ["close"],
+                     "outputs": {"": "daily_return"}},
+    "cumulative_return": {"cls": CumulativeReturnIndicator, "inputs": ["close"],
+                          "outputs": {"": "cumulative_return"}, "anchor": "cumulative_return"},
+}
+
+
+def _missing_params(entry: dict, spec: dict):
+    """Constructor arguments without a default that neither the registry nor the spec supplies."""
+    given = {*entry["inputs"], *entry.get("params", {}), *spec.get("params", {})}
+    return [name for name, param in inspect.signature(entry["cls"]).parameters.items()
+            if param.default is inspect.Parameter.empty and name not in given]
+
+
+@lru_cache(maxsize=None)
+def _load_indicator_config(path: str):
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    indicators = config.get("indicators", "all")
+    if indicators == "all":
+        return None
+
+    for spec in indicators:
+        if spec.get("indicator") not in INDICATOR_REGISTRY:
+            raise ValueError(f"Unknown indicator in {path}: {spec.get('indicator')}")
+        if not spec.get("name"):
+            raise ValueError(f"Indicator in {path} is missing a name: {spec}")
+        missing = _missing_params(INDICATOR_REGISTRY[spec["indicator"]], spec)
+        if missing:
+            raise ValueError(f"Indicator {spec['name']} in {path} is missing required params: {', '.join(missing)}")
+    return tuple(json.dumps(spec, sort_keys=True) for spec in indicators)
+
+
+def get_indicator_config():
+    """
+    Return the configured indicator specs, or None to store every ta feature.
+
+    The config file (INDICATOR_CONFIG, default src/indicators.json) holds
+    {"indicators": "all"} or a list such as
+    [{"name": "rsi_14", "indicator": "rsi", "params": {"window": 14}}, ...].
+    """
+    load_dotenv()
+    path = os.environ.get("INDICATOR_CONFIG", "src/indicators.json")
+    if not os.path.exists(path):
+        return None
+
+    specs = _load_indicator_config(path)
+    if specs is None:
+        return None
+    return [json.loads(spec) for spec in specs]
+
+
+def _column_name(name: str, suffix: str):
+    return f"{name}_{suffix}" if suffix else name
+
+
+def get_anchored_columns(specs=None):
+    if specs is None:
+        return ADDITIVE_COLUMNS, MULTIPLICATIVE_COLUMNS, CUMULATIVE_RETURN_COLUMNS
+
+    anchored = {"additive": [], "multiplicative": [], "cumulative_return": []}
+    for spec in specs:
+        entry = INDICATOR_REGISTRY[spec["indicator"]]
+        if entry.get("anchor"):
+            for suffix in entry["outputs"]:
+                anchored[entry["anchor"]].append(_column_name(spec["name"], suffix))
+    return anchored["additive"], anchored["multiplicative"], anchored["cumulative_return"]
+
+
+def add_indicators(data: pd.DataFrame, specs=None):
+    if specs is None:
+        return ta.add_all_ta_features(
+            df=data,
+            open="Open", high="High", low="Low", close="Close", volume="Volume",
+            fillna=True
+        )
+
+    for spec in specs:
+        entry = INDICATOR_REGISTRY[spec["indicator"]]
+        inputs = {name: data[INPUT_COLUMNS[name]] for name in entry["inputs"]}
+        params = {**entry.get("params", {}), **spec.get("params", {})}
+        indicator = entry["cls"](**inputs, **params, fillna=True)
+        for suffix, method in entry["outputs"].items():
+            data[_column_name(spec["name"], suffix)] = getattr(indicator, method)()
+    return data
+
+
+def _lookback(entry: dict, spec: dict):
+    """Longest window among the indicator's integer arguments, defaults included."""
+    params = {name: param.default for name, param in inspect.signature(entry["cls"]).parameters.items()}
+    params.update({**entry.get("params", {}), **spec.get("params", {})})
+    return max([value for value in params.values() if isinstance(value, int) and not isinstance(value, bool)],
+               default=1)
+
+
+def get_seed_window(specs=None):
+    """Stored rows to recompute indicators over so the tail matches a full recompute."""
+    if specs is None:
+        return ALL_FEATURES_LOOKBACK * CONVERGENCE_FACTOR
+
+    window = 1
+    for spec in specs:
+        entry = INDICATOR_REGISTRY[spec["indicator"]]
+        factor = CONVERGENCE_FACTOR if entry.get("recursive") else ROLLING_FACTOR
+        window = max(window, _lookback(entry, spec) * factor)
+    return window
+
+
+def add_indicators_tail(stored: pd.DataFrame, new_bars: pd.DataFrame, specs=None):
+    """
+    Compute indicators for new_bars only.
+
+    stored holds the trailing stored rows (OHLCV and indicator columns)
+    just before new_bars, oldest first. It should cover the seed window so
+    the EMA-type indicators have converged to their full-history values.
+    """
+    data = pd.concat([stored[OHLCV_COLUMNS], new_bars[OHLCV_COLUMNS]], ignore_index=True)
+    data = add_indicators(data, specs)
+
+    tail = data.iloc[len(stored):].reset_index(drop=True)
+    if stored.empty:
+        return tail
+
+    if set(tail.columns) != set(stored.columns):
+        raise IndicatorSchemaChanged("Stored columns do not match the indicator config")
+
+    last_stored = stored.iloc[-1]
+    last_computed = data.iloc[len(stored) - 1]
+    additive, multiplicative, cumulative_return = get_anchored_columns(specs)
+
+    for col in additive:
+        tail[col] = tail[col] - last_computed[col] + last_stored[col]
+
+    for col in multiplicative:
+        tail[col] = tail[col] / last_computed[col] * last_stored[col]
+
+    for col in cumulative_return:
+        growth = (1 + tail[col] / 100) / (1 + last_computed[col] / 100)
+        tail[col] = (growth * (1 + last_stored[col] / 100) - 1) * 100
+
+    return tail
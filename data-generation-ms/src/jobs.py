@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class Job:
+    """State and per-ticker progress of one ingestion run."""
+
+    def __init__(self, kind: str, tickers: list = None, resumed_from: str = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.tickers = tickers or []
+        self.resumed_from = resumed_from
+        self.status = PENDING
+        self.message = None
+        self.result = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.completed = []
+        self.failed = {}
+        self.timings = {}
+        self.version = 0
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == PENDING:
+            self._finish(CANCELLED, "Job cancelled before it started")
+
+    def record(self, ticker: str, error: str = None, seconds: float = None):
+        with self._changed:
+            if error:
+                self.failed[ticker] = error
+            else:
+                self.completed.append(ticker)
+            if seconds is not None:
+                self.timings[ticker] = round(seconds, 3)
+            self._notify()
+
+    def remaining(self):
+        done = set(self.completed)
+        return [ticker for ticker in self.tickers if ticker not in done]
+
+    def wait_for_change(self, version: int, timeout: float = 15.0):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def _start(self):
+        with self._changed:
+            self.status = RUNNING
+            self.started_at = datetime.now(timezone.utc)
+            self._notify()
+
+    def _finish(self, status: str, message: str = None, result=None):
+        with self._changed:
+            self.status = status
+            self.message = message
+            self.result = result
+            self.finished_at = datetime.now(timezone.utc)
+            self._notify()
+
+    def _notify(self):
+        self.version += 1
+        self._changed.notify_all()
+
+    def to_dict(self):
+        with self._changed:
+            elapsed = None
+            if self.started_at:
+                end = self.finished_at or datetime.now(timezone.utc)
+                elapsed = round((end - self.started_at).total_seconds(), 3)
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "message": self.message,
+                "result": self.result,
+                "resumed_from": self.resumed_from,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "elapsed_seconds": elapsed,
+                "total": len(self.tickers),
+                "completed": len(self.completed),
+                "failed": dict(self.failed),
+                "timings": dict(self.timings),
+            }
+
+
+class JobManager:
+    """Runs ingestion jobs on a dedicated executor so API workers stay free."""
+
+    def __init__(self, max_workers: int = None, max_finished: int = None, retention_seconds: float = None):
+        load_dotenv()
+        max_workers = max_workers or int(os.environ.get("JOB_WORKERS", 1))
+        self.max_finished = max_finished if max_finished is not None else int(os.environ.get("JOB_MAX_FINISHED", 100))
+        self.retention_seconds = (retention_seconds if retention_seconds is not None
+                                  else float(os.environ.get("JOB_RETENTION_SECONDS", 86400)))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion-job")
+        self._jobs = {}
+        self._runners = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, runner, tickers: list = None, resumed_from: str = None):
+        """runner(job) does the work and returns the job result."""
+        job = Job(kind, tickers, resumed_from)
+        with self._lock:
+            self._evict_finished()
+            self._jobs[job.id] = job
+            self._runners[job.id] = runner
+        self._executor.submit(self._run, job, runner)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            job.cancel()
+        return job
+
+    def resume(self, job_id: str):
+        """Start a new job covering the tickers the given job did not complete."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status not in FINISHED_STATES:
+            raise ValueError("Job is still running")
+        with self._lock:
+            runner = self._runners[job.id]
+        return self.submit(job.kind, runner, job.remaining(), resumed_from=job.id)
+
+    def _evict_finished(self):
+        """
+        Forget finished jobs older than retention_seconds, and all but the
+        newest max_finished. Runs under the lock; pending and running jobs
+        are never evicted.
+        """
+        finished = sorted((job for job in self._jobs.values() if job.status in FINISHED_STATES),
+                          key=lambda job: job.finished_at or job.created_at, reverse=True)
+        now = datetime.now(timezone.utc)
+        for index, job in enumerate(finished):
+            age = (now - (job.finished_at or job.created_at)).total_seconds()
+            if index >= self.max_finished or age > self.retention_seconds:
+                del self._jobs[job.id]
+                self._runners.pop(job.id, None)
+
+    def _run(self, job: Job, runner):
+        if job.is_cancelled():
+            return
+        job._start()
+        started = time.perf_counter()
+        try:
+            result = runner(job)
+            elapsed = time.perf_counter() - started
+            if job.is_cancelled():
+                job._finish(CANCELLED, f"Job cancelled after {elapsed:.1f}s", result)
+            elif job.failed:
+                job._finish(COMPLETED, f"Job finished with {len(job.failed)} failures", result)
+            else:
+                job._finish(COMPLETED, "Job completed successfully", result)
+        except Exception as e:
+            job._finish(FAILED, f"Job failed: {str(e)}")
@@ -1,12 +1,26 @@
-from fastapi import FastAPI
+import itertools
+import json
+from datetime import date
+from typing import Optional
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
-from src.generate_stock_data import generate_stock_data
-from src.retrive_stock_data import retrive_stock_data
+from fastapi.responses import StreamingResponse
+from src.generate_stock_data import generate_stock_data, generate_stock_data_batch
+from src.retrive_stock_data import iter_stock_data, retrive_stock_data
 from src.generate_stock_info import generate_stock_info
 from src.top_gainers_losers import find_top_gainers_losers
+from src.prices_store import migrate_ticker_tables
+from src.performance_snapshot import refresh_performance_snapshot
+from src.price_matrix import build_price_matrix
+from src.database import get_engine
+from src.jobs import JobManager, FINISHED_STATES
+from src.columnar_response import columnar_response, negotiate_columnar
+from src.frame_json import FRAME_ORIENTS, frame_payload, json_response
+from src.streaming import STREAM_CHUNK_SIZE, STREAM_FORMATS, stream_frames, stream_media_type
 import pandas as pd
 
 app = FastAPI()
+jobs = JobManager()
 
 origins = ["*"]
 
@@ -19,40 +33,168 @@ app.add_middleware(
 )
 
 
+def read_tickers():
+    with open('src/tickers.txt', 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def run_status_task(task):
+    result = task()
+    if result and result.get("status") != 200:
+        raise RuntimeError(result.get("message"))
+    return result
+
+
 @app.get("/")
 def health_check():
     return {"message": "Data Generation microservice is running!", "status": 200}
 
 
 @app.get("/generate-data", tags=["Data Generation"])
-def generate_data():
+def generate_data(batched: bool = True, incremental: bool = True):
     try:
-        file = open('src/tickers.txt', 'r')
-        for ticker in file:
-            ticker = ticker.strip()
-            if ticker:
-                generate_stock_data(ticker)
+        tickers = read_tickers()
+        if batched:
+            result = generate_stock_data_batch(tickers, incremental=incremental)
+            return {"data": result, "message": "Data generation completed successfully", "status": 200}
+        generate_stock_data(tickers, incremental=incremental)
         return {"message": "Data generation completed successfully", "status": 200}
     except Exception as e:
         return {"message": f"Error generating stock data: {str(e)}", "status": 500}
-    finally:
-        file.close()
 
 @app.get("/generate-stock-info", tags=["Data Generation"])
 def generate_info():
-    generate_stock_info()
+    return generate_stock_info()
 
 @app.get("/generate-top-gainers-losers", tags=["Data Generation"])
 def generate_top_gainers_losers():
-    find_top_gainers_losers()
+    return find_top_gainers_losers()
+
+@app.get("/generate-performance-snapshot", tags=["Data Generation"])
+def generate_performance_snapshot():
+    engine = get_engine()
+    try:
+        count = refresh_performance_snapshot(engine)
+        return {"message": f"Performance snapshot generated for {count} tickers", "status": 200}
+    except Exception as e:
+        return {"message": f"Error generating performance snapshot: {str(e)}", "status": 500}
+    finally:
+        engine.dispose()
+
+@app.get("/generate-price-matrix", tags=["Data Generation"])
+def generate_price_matrix():
+    engine = get_engine()
+    try:
+        version = build_price_matrix(engine)
+        if version is None:
+            return {"message": "PRICE_MATRIX_PATH environment variable is not set", "status": 400}
+        return {"data": {"version": version}, "message": "Price matrix generated successfully", "status": 200}
+    except Exception as e:
+        return {"message": f"Error generating price matrix: {str(e)}", "status": 500}
+    finally:
+        engine.dispose()
+
+@app.get("/migrate-prices", tags=["Data Generation"])
+def migrate_prices():
+    engine = get_engine()
+    try:
+        tickers = read_tickers()
+        migrated = migrate_ticker_tables(tickers, engine)
+        return {"data": migrated, "message": "Prices migrated successfully", "status": 200}
+    except Exception as e:
+        return {"message": f"Error migrating prices: {str(e)}", "status": 500}
+    finally:
+        engine.dispose()
+
+@app.post("/jobs/generate-data", tags=["Jobs"])
+def submit_generate_data(incremental: bool = True):
+    try:
+        job = jobs.submit(
+            "generate-data",
+            lambda job: generate_stock_data_batch(job.tickers, incremental=incremental, job=job),
+            read_tickers()
+        )
+        return {"data": job.to_dict(), "message": "Data generation job submitted", "status": 202}
+    except Exception as e:
+        return {"message": f"Error submitting data generation job: {str(e)}", "status": 500}
+
+@app.post("/jobs/generate-stock-info", tags=["Jobs"])
+def submit_generate_info():
+    job = jobs.submit("generate-stock-info", lambda job: run_status_task(generate_stock_info))
+    return {"data": job.to_dict(), "message": "Stock info job submitted", "status": 202}
+
+@app.post("/jobs/generate-top-gainers-losers", tags=["Jobs"])
+def submit_generate_top_gainers_losers():
+    job = jobs.submit("generate-top-gainers-losers", lambda job: run_status_task(find_top_gainers_losers))
+    return {"data": job.to_dict(), "message": "Top gainers and losers job submitted", "status": 202}
+
+@app.get("/jobs", tags=["Jobs"])
+def list_jobs():
+    return {"data": [job.to_dict() for job in jobs.list_jobs()], "message": "Jobs retrieved successfully", "status": 200}
+
+@app.get("/jobs/{job_id}", tags=["Jobs"])
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return {"message": "Job not found", "status": 404}
+    return {"data": job.to_dict(), "message": "Job retrieved successfully", "status": 200}
+
+@app.get("/jobs/{job_id}/stream", tags=["Jobs"])
+def stream_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return {"message": "Job not found", "status": 404}
+
+    def events():
+        version = -1
+        while True:
+            version = job.wait_for_change(version)
+            state = job.to_dict()
+            yield json.dumps(state) + "\n"
+            if state["status"] in FINISHED_STATES:
+                break
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/jobs/{job_id}/cancel", tags=["Jobs"])
+def cancel_job(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        return {"message": "Job not found", "status": 404}
+    return {"data": job.to_dict(), "message": "Job cancellation requested", "status": 200}
+
+@app.post("/jobs/{job_id}/resume", tags=["Jobs"])
+def resume_job(job_id: str):
+    try:
+        job = jobs.resume(job_id)
+        if job is None:
+            return {"message": "Job not found", "status": 404}
+        return {"data": job.to_dict(), "message": "Job resumed", "status": 202}
+    except ValueError as e:
+        return {"message": str(e), "status": 409}
 
 @app.get("/retrive-data", tags=["Data Retrieval"])
-def retrive_data(ticker: str):
+def retrive_data(ticker: str, columns: Optional[str] = None, start: Optional[date] = None,
+                 end: Optional[date] = None, limit: Optional[int] = None, tail: Optional[int] = None,
+                 orient: str = "records", stream: Optional[str] = None, accept: Optional[str] = Header(None)):
+    if stream and stream not in STREAM_FORMATS:
+        return {"message": f"Unsupported stream format: {stream}", "status": 400}
+    if orient not in FRAME_ORIENTS:
+        return {"message": f"Unsupported orient: {orient}", "status": 400}
     try:
-        data = retrive_stock_data(ticker)
-        for col in data.select_dtypes(include=['datetime64']).columns:
-            data[col] = data[col].dt.strftime('%Y-%m-%d')
-        data_dict = data.to_dict(orient="records")
-        return {"data": data_dict, "message": "Stock data retrieved successfully", "status": 200}
+        columns = [col.strip() for col in columns.split(",") if col.strip()] if columns else None
+        if stream:
+            chunks = iter_stock_data(ticker, columns, start, end, limit, tail, STREAM_CHUNK_SIZE)
+            first = next(chunks, None)
+            if first is not None:
+                chunks = itertools.chain([first], chunks)
+            return StreamingResponse(stream_frames(chunks, stream, "Stock data retrieved successfully"),
+                                     media_type=stream_media_type(stream))
+        data = retrive_stock_data(ticker, columns, start, end, limit, tail)
+        media_type = negotiate_columnar(accept)
+        if media_type:
+            return columnar_response(data, media_type)
+        return json_response({"data": frame_payload(data, orient), "message": "Stock data retrieved successfully",
+                              "status": 200})
     except Exception as e:
         return {"message": f"Error retrieving stock data: {str(e)}", "status": 500}
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, inspect, text
+from src.bulk_writer import copy_frame, replace_table
+from src.prices_store import days_before
+
+SNAPSHOT_TABLE = "performance_snapshot"
+
+HORIZONS = {
+    "1d": pd.DateOffset(days=1),
+    "1w": pd.DateOffset(weeks=1),
+    "1m": pd.DateOffset(months=1),
+    "3m": pd.DateOffset(months=3),
+    "6m": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+}
+
+TRADING_DAYS = 252
+
+# Longest horizon (one year, up to 366 days) plus a week to find its base close.
+LOOKBACK_DAYS = 373
+
+
+def _read_snapshot_prices(engine, tickers: list = None):
+    latest_query = "SELECT ticker, MAX(date) AS latest_date FROM prices"
+    if tickers:
+        latest_query += " WHERE ticker IN :tickers"
+    latest_query += " GROUP BY ticker"
+    latest_query = text(latest_query)
+    params = {}
+    if tickers:
+        latest_query = latest_query.bindparams(bindparam("tickers", expanding=True))
+        params["tickers"] = tickers
+
+    latest = pd.read_sql_query(latest_query, engine, params=params)
+    if latest.empty:
+        return latest, pd.DataFrame()
+    latest['latest_date'] = pd.to_datetime(latest['latest_date'])
+
+    # Bounded per ticker by its own latest date, so a stale or delisted ticker
+    # does not widen the scan for everyone else.
+    since = days_before(engine.dialect.name, "l.latest_date", LOOKBACK_DAYS)
+    ticker_filter = " WHERE ticker IN :tickers" if tickers else ""
+    query = text(f"""
+        WITH latest AS (SELECT ticker, MAX(date) AS latest_date FROM prices{ticker_filter} GROUP BY ticker)
+        SELECT p.ticker, p.date, p.high, p.low, p.close, p.volume
+        FROM prices p JOIN latest l ON p.ticker = l.ticker
+        WHERE p.date >= {since}
+    """)
+    if tickers:
+        query = query.bindparams(bindparam("tickers", expanding=True))
+
+    data = pd.read_sql_query(query, engine, params=params)
+    data['date'] = pd.to_datetime(data['date'])
+    return latest, data.sort_values(['ticker', 'date'])
+
+
+def _close_on_or_before(data: pd.DataFrame, targets: pd.DataFrame):
+    """Close of the last bar on or before each ticker's target_date."""
+    matched = pd.merge_asof(
+        targets.sort_values('target_date'),
+        data[['ticker', 'date', 'close']].sort_values('date'),
+        left_on='target_date', right_on='date', by='ticker', direction='backward'
+    )
+    return matched.set_index('ticker')['close']
+
+
+def compute_performance_snapshot(latest: pd.DataFrame, data: pd.DataFrame):
+    """One row per ticker with the latest close, horizon returns and risk stats."""
+    data = data.merge(latest, on='ticker')
+    snapshot = latest.set_index('ticker')
+
+    last_rows = data[data['date'] == data['latest_date']].set_index('ticker')
+    snapshot['latest_close'] = last_rows['close']
+
+    for horizon, offset in HORIZONS.items():
+        targets = latest.assign(target_date=latest['latest_date'] - offset)[['ticker', 'target_date']]
+        base = _close_on_or_before(data, targets)
+        snapshot[f"return_{horizon}"] = (snapshot['latest_close'] / base - 1) * 100
+
+    year_start = latest['latest_date'].dt.to_period('Y').dt.start_time
+    targets = latest.assign(target_date=year_start - pd.Timedelta(days=1))[['ticker', 'target_date']]
+    base = _close_on_or_before(data, targets)
+    snapshot['return_ytd'] = (snapshot['latest_close'] / base - 1) * 100
+
+    last_year = data[data['date'] > data['latest_date'] - pd.DateOffset(years=1)]
+    yearly = last_year.groupby('ticker')
+    snapshot['high_52w'] = yearly['high'].max()
+    snapshot['low_52w'] = yearly['low'].min()
+
+    log_returns = np.log(last_year['close']).groupby(last_year['ticker']).diff()
+    snapshot['volatility_1y'] = log_returns.groupby(last_year['ticker']).std() * np.sqrt(TRADING_DAYS) * 100
+
+    last_quarter = data[data['date'] > data['latest_date'] - pd.DateOffset(months=3)]
+    snapshot['avg_volume_3m'] = last_quarter.groupby('ticker')['volume'].mean()
+
+    snapshot = snapshot.reset_index()
+    snapshot['latest_date'] = snapshot['latest_date'].dt.date
+    return snapshot
+
+
+def refresh_performance_snapshot(engine, tickers: list = None):
+    """
+    Recompute snapshot rows for tickers (all tickers in prices if None) and
+    replace just those rows in the snapshot table.
+    """
+    latest, data = _read_snapshot_prices(engine, tickers)
+    if latest.empty:
+        return 0
+
+    snapshot = compute_performance_snapshot(latest, data)
+
+    if not tickers or not inspect(engine).has_table(SNAPSHOT_TABLE):
+        replace_table(snapshot, SNAPSHOT_TABLE, engine)
+        return len(snapshot)
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"DELETE FROM {SNAPSHOT_TABLE} WHERE ticker IN :tickers").bindparams(
+                bindparam("tickers", expanding=True)),
+            {"tickers": list(snapshot['ticker'])}
+        )
+        copy_frame(snapshot, SNAPSHOT_TABLE, conn)
+    return len(snapshot)
@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+# Versions kept on disk so readers still mapping the previous one are not
+# pulled out from under them.
+KEEP_VERSIONS = 2
+
+
+def get_matrix_path():
+    """Root of the memory-mapped price matrix, or None when PRICE_MATRIX_PATH is unset."""
+    load_dotenv()
+    return os.environ.get("PRICE_MATRIX_PATH") or None
+
+
+def build_price_matrix(engine, root: str = None):
+    """
+    Write a dates x tickers float64 .npy file per OHLCV field from prices.
+
+    Each build goes into a new version directory with an index.json header
+    (tickers, dates, fields). The CURRENT file is swapped last, so readers
+    always see a complete version.
+    """
+    root = root or get_matrix_path()
+    if root is None:
+        return None
+
+    query = "SELECT ticker, date, open, high, low, close, volume FROM prices"
+    data = pd.read_sql_query(text(query), engine)
+    data['date'] = pd.to_datetime(data['date'])
+
+    tickers = sorted(data['ticker'].unique())
+    dates = pd.DatetimeIndex(sorted(data['date'].unique()))
+
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    directory = os.path.join(root, version)
+    os.makedirs(directory)
+
+    for field in FIELDS:
+        matrix = data.pivot(index='date', columns='ticker', values=field).reindex(index=dates, columns=tickers)
+        out = np.lib.format.open_memmap(
+            os.path.join(directory, f"{field}.npy"), mode="w+", dtype=np.float64, shape=matrix.shape
+        )
+        out[:] = matrix.to_numpy(dtype=np.float64)
+        out.flush()
+        del out
+
+    header = {
+        "version": version,
+        "tickers": tickers,
+        "dates": [date.strftime('%Y-%m-%d') for date in dates],
+        "fields": FIELDS,
+    }
+    with open(os.path.join(directory, "index.json"), 'w') as f:
+        json.dump(header, f)
+
+    tmp_path = os.path.join(root, "CURRENT.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, "CURRENT"))
+
+    versions = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+    return version
+
+
+class PriceMatrix:
+    """Read-only memory-mapped view of one price matrix version."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "index.json"), 'r') as f:
+            header = json.load(f)
+
+        self.version = header["version"]
+        self.tickers = header["tickers"]
+        self.dates = np.array(header["dates"], dtype="datetime64[D]")
+        self.fields = {
+            field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+            for field in header["fields"]
+        }
+        self._columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def __getitem__(self, field: str):
+        return self.fields[field]
+
+    def column(self, field: str, ticker: str):
+        return self.fields[field][:, self._columns[ticker]]
+
+    def row_at_or_before(self, date):
+        return int(np.searchsorted(self.dates, np.datetime64(date, "D"), side="right")) - 1
+
+
+_open_matrices = {}
+
+
+def open_price_matrix(root: str = None):
+    """Map the current version, reusing the mapping until ingestion swaps it."""
+    root = root or get_matrix_path()
+    if root is None:
+        raise ValueError("PRICE_MATRIX_PATH environment variable is not set")
+
+    with open(os.path.join(root, "CURRENT"), 'r') as f:
+        version = f.read().strip()
+
+    matrix = _open_matrices.get(root)
+    if matrix is None or matrix.version != version:
+        matrix = PriceMatrix(os.path.join(root, version))
+        _open_matrices[root] = matrix
+    return matrix
@@ -0,0 +1,140 @@
+import pandas as pd
+from sqlalchemy import inspect, text
+from src.bar_rollups import ensure_bar_rollups_table, write_bar_rollups
+from src.bulk_writer import copy_frame
+
+PRICES_TABLE = "prices"
+PRICE_PARTITIONS = 8
+
+PRICE_COLUMNS = {"Date": "date", "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+
+PRICES_DDL = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker VARCHAR(32) NOT NULL,
+    date DATE NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    volume BIGINT,
+    PRIMARY KEY (ticker, date)
+)
+"""
+
+
+def ensure_prices_table(engine):
+    """Create the long-format prices table, hash-partitioned by ticker on Postgres."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(PRICES_DDL + " PARTITION BY HASH (ticker)"))
+            for remainder in range(PRICE_PARTITIONS):
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS prices_p{remainder} PARTITION OF prices "
+                    f"FOR VALUES WITH (MODULUS {PRICE_PARTITIONS}, REMAINDER {remainder})"
+                ))
+        else:
+            conn.execute(text(PRICES_DDL))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS prices_date_idx ON prices (date)"))
+
+
+def days_before(dialect: str, column: str, days: int):
+    """SQL expression for the date days before a DATE column, on Postgres or SQLite."""
+    if dialect == "postgresql":
+        return f"{column} - {days}"
+    return f"date({column}, '-{days} days')"
+
+
+def to_price_rows(ticker: str, data: pd.DataFrame):
+    rows = data[list(PRICE_COLUMNS)].rename(columns=PRICE_COLUMNS)
+    rows.insert(0, "ticker", ticker)
+    rows["volume"] = rows["volume"].round().astype("Int64")
+    return rows
+
+
+def write_prices(ticker: str, data: pd.DataFrame, conn, since=None):
+    """Replace the ticker's rows from since onwards (all rows if since is None)."""
+    if since is None:
+        conn.execute(text("DELETE FROM prices WHERE ticker = :ticker"), {"ticker": ticker})
+    else:
+        conn.execute(text("DELETE FROM prices WHERE ticker = :ticker AND date >= :since"),
+                     {"ticker": ticker, "since": since})
+    copy_frame(to_price_rows(ticker, data), PRICES_TABLE, conn)
+
+
+def read_ticker_prices(ticker: str, conn):
+    """OHLCV rows of the ticker's own table."""
+    columns = ", ".join(f"\"{col}\"" for col in PRICE_COLUMNS)
+    data = pd.read_sql_query(text(f"SELECT {columns} FROM \"{ticker}\""), conn)
+    data['Date'] = pd.to_datetime(data['Date']).dt.date
+    return data
+
+
+def prices_cover_table(ticker: str, conn):
+    """Whether prices holds the ticker's history back to the first row of its own table."""
+    first_price = conn.execute(text("SELECT MIN(date) FROM prices WHERE ticker = :ticker"), {"ticker": ticker}).scalar()
+    first_bar = conn.execute(text(f"SELECT MIN(\"Date\") FROM \"{ticker}\"")).scalar()
+    if first_bar is None:
+        return True
+    return first_price is not None and pd.Timestamp(first_price).date() <= pd.Timestamp(first_bar).date()
+
+
+def append_prices(ticker: str, data: pd.DataFrame, conn, since):
+    """
+    write_prices for an incremental update. A ticker whose prices rows do not
+    reach back to the start of its own table (e.g. one ingested before
+    prices existed) is backfilled from that table in full instead; the
+    ticker table must already hold data on conn.
+    """
+    if prices_cover_table(ticker, conn):
+        write_prices(ticker, data, conn, since)
+    else:
+        write_prices(ticker, read_ticker_prices(ticker, conn), conn)
+
+
+def migrate_ticker_tables(tickers: list, engine):
+    """Import OHLCV rows from the legacy per-ticker tables into prices and its weekly/monthly rollups."""
+    ensure_prices_table(engine)
+    ensure_bar_rollups_table(engine)
+
+    migrated = {}
+    for ticker in tickers:
+        if not inspect(engine).has_table(ticker):
+            continue
+        with engine.begin() as conn:
+            data = read_ticker_prices(ticker, conn)
+            write_prices(ticker, data, conn)
+            write_bar_rollups(ticker, conn)
+        migrated[ticker] = len(data)
+        print(f"Migrated {len(data)} rows for {ticker}")
+
+    return migrated
+
+
+def read_prices(engine, tickers: list = None, start=None, end=None, columns: list = None):
+    columns = columns or ["open", "high", "low", "close", "volume"]
+    for col in columns:
+        if col not in PRICE_COLUMNS.values():
+            raise ValueError(f"Unknown price column: {col}")
+
+    conditions = []
+    params = {}
+
+    if tickers:
+        placeholders = ", ".join(f":ticker_{i}" for i in range(len(tickers)))
+        conditions.append(f"ticker IN ({placeholders})")
+        params.update({f"ticker_{i}": ticker for i, ticker in enumerate(tickers)})
+    if start is not None:
+        conditions.append("date >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("date <= :end")
+        params["end"] = end
+
+    query = f"SELECT ticker, date, {', '.join(columns)} FROM prices"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY ticker, date"
+
+    data = pd.read_sql_query(text(query), engine, params=params)
+    data['date'] = pd.to_datetime(data['date'])
+    return data
@@ -1,9 +1,65 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 import os
 from dotenv import load_dotenv
+from src.columnar_store import columnar_columns, has_ticker, read_columnar
+
+
+def check_columns(table_columns: list, columns: list):
+    unknown = [col for col in columns if col not in table_columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+
+def build_history_query(ticker: str, table_columns: list, columns: list = None, start=None, end=None,
+                        limit: int = None, tail: int = None):
+    """
+    Build a SELECT on the ticker table with the projection, date range and
+    row limit pushed down. tail returns the last rows, oldest first.
+    """
+    if columns:
+        check_columns(table_columns, columns)
+        selected = ["Date"] + [col for col in columns if col != "Date"]
+    else:
+        selected = table_columns
+
+    select = ", ".join(f"\"{col}\"" for col in selected)
+    query = f"SELECT {select} FROM \"{ticker}\""
+    conditions = []
+    params = {}
+    if start is not None:
+        conditions.append("\"Date\" >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("\"Date\" <= :end")
+        params["end"] = end
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    if tail:
+        query += " ORDER BY \"Date\" DESC LIMIT :n"
+        query = f"SELECT * FROM ({query}) AS tail_rows ORDER BY \"Date\""
+        params["n"] = tail
+    else:
+        query += " ORDER BY \"Date\""
+        if limit:
+            query += " LIMIT :n"
+            params["n"] = limit
+
+    return text(query), params
+
+
+def retrive_stock_data(ticker: str, columns: list = None, start=None, end=None, limit: int = None, tail: int = None):
+    if has_ticker(ticker):
+        if columns:
+            check_columns(columnar_columns(ticker), columns)
+        data = read_columnar([ticker], columns=columns, start=start, end=end).drop(columns="ticker")
+        if tail:
+            return data.tail(tail).reset_index(drop=True)
+        if limit:
+            return data.head(limit)
+        return data
 
-def retrive_stock_data(ticker: str):
     load_dotenv()
     
     DATABASE_URL = os.environ.get("DATABASE_URL")
@@ -13,10 +69,37 @@ def retrive_stock_data(ticker: str):
     
     engine = create_engine(DATABASE_URL)
     
-    query = f"SELECT * FROM \"{ticker}\""
-    data = pd.read_sql_query(text(query), engine)
+    table_columns = [col["name"] for col in inspect(engine).get_columns(ticker)]
+    query, params = build_history_query(ticker, table_columns, columns, start, end, limit, tail)
+    data = pd.read_sql_query(query, engine, params=params)
     
     engine.dispose()
     
     return data
-    
+
+
+def iter_stock_data(ticker: str, columns: list = None, start=None, end=None, limit: int = None, tail: int = None,
+                    chunksize: int = 500):
+    """Yield the same rows as retrive_stock_data in chunks, using a server-side cursor for SQL."""
+    if has_ticker(ticker):
+        data = retrive_stock_data(ticker, columns, start, end, limit, tail)
+        for i in range(0, len(data), chunksize):
+            yield data.iloc[i:i + chunksize].copy()
+        return
+
+    load_dotenv()
+
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+
+    if not DATABASE_URL:
+        raise ValueError("DATABASE_URL environment variable is not set")
+
+    engine = create_engine(DATABASE_URL)
+
+    try:
+        table_columns = [col["name"] for col in inspect(engine).get_columns(ticker)]
+        query, params = build_history_query(ticker, table_columns, columns, start, end, limit, tail)
+        with engine.connect().execution_options(stream_results=True) as conn:
+            yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+    finally:
+        engine.dispose()
@@ -0,0 +1,36 @@
+import json
+from src.frame_json import dumps, frame_payload
+
+STREAM_CHUNK_SIZE = 500
+
+STREAM_FORMATS = ("ndjson", "json")
+
+
+def stream_frames(chunks, stream_format: str, message: str):
+    """
+    Encode DataFrame chunks as they arrive.
+
+    "ndjson" emits one record per line. "json" emits the usual
+    {"data": [...], "message": ..., "status": 200} envelope as a chunked
+    array.
+    """
+    if stream_format == "ndjson":
+        for chunk in chunks:
+            if not chunk.empty:
+                yield b"".join(dumps(record) + b"\n" for record in frame_payload(chunk))
+        return
+
+    yield "{\"data\":["
+    first = True
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        # Same encoder as the non-streamed responses, so values match byte for byte.
+        records = dumps(frame_payload(chunk)).decode()[1:-1]
+        yield records if first else "," + records
+        first = False
+    yield "]," + json.dumps({"message": message, "status": 200}, separators=(",", ":"))[1:]
+
+
+def stream_media_type(stream_format: str):
+    return "application/x-ndjson" if stream_format == "ndjson" else "application/json"
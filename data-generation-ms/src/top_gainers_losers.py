@@ -1,95 +1,75 @@
 import pandas as pd
-import os
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
-
-def get_stock_data(ticker):
-    load_dotenv()
-    
-    DATABASE_URL = os.environ.get("DATABASE_URL")
-    
-    if not DATABASE_URL:
-        raise ValueError("DATABASE_URL environment variable is not set")
-    
-    engine = create_engine(DATABASE_URL)
-    
-    query = f"SELECT * FROM \"{ticker}\""
-    data = pd.read_sql_query(text(query), engine)
-    
-    engine.dispose()
-    
-    return data
-
-def calculate_monthly_performance(ticker):
-    try:
-        data = get_stock_data(ticker)
-
-        data['Date'] = pd.to_datetime(data['Date'])
-        
-        data = data.sort_values('Date')
-
-        latest_date = data['Date'].max()
-        prev_date = latest_date - timedelta(days=30)
-        
-        latest_price = data.loc[data['Date'] == latest_date, 'Close'].iloc[0]
-
-        month_ago_data = data[data['Date'] >= prev_date]
-        if len(month_ago_data) == 0:
-            print(f"Warning: No data found for {ticker} from 1 month ago")
-            return None
-        
-        month_ago_price = month_ago_data['Close'].iloc[0]
-
-        pct_change = ((latest_price - month_ago_price) / month_ago_price) * 100
-        
-        return {
-            'ticker': ticker,
-            'current_price': latest_price,
-            'month_ago_price': month_ago_price,
-            'percentage_change': pct_change,
-        }
-        
-    except Exception as e:
-        print(f"Error processing {ticker}: {str(e)}")
-        return None
+from sqlalchemy import bindparam, text
+from src.bulk_writer import replace_table
+from src.data_versions import TOP_GAINERS_LOSERS_SCOPE, bump_data_version, ensure_data_versions_table
+from src.database import get_engine
+from src.prices_store import days_before
+
+
+LOOKBACK_DAYS = 30
+
+
+def calculate_monthly_performance(tickers: list, engine):
+    """
+    Compare each ticker's latest close with its first close in the 30 days
+    before it, for the whole universe in one query.
+
+    The window is bounded per ticker by its own latest date, so a stale or
+    delisted ticker does not widen the scan for everyone else, and only the
+    two closes per ticker are returned.
+    """
+    columns = ['ticker', 'current_price', 'month_ago_price', 'percentage_change']
+    if not tickers:
+        return pd.DataFrame(columns=columns)
+
+    since = days_before(engine.dialect.name, "l.latest_date", LOOKBACK_DAYS)
+    query = text(f"""
+        WITH latest AS (
+            SELECT ticker, MAX(date) AS latest_date FROM prices WHERE ticker IN :tickers GROUP BY ticker
+        ),
+        bounds AS (
+            SELECT p.ticker, MIN(p.date) AS first_date, MAX(p.date) AS last_date
+            FROM prices p JOIN latest l ON p.ticker = l.ticker
+            WHERE p.date >= {since} AND p.close IS NOT NULL
+            GROUP BY p.ticker
+        )
+        SELECT b.ticker, cur.close AS current_price, ago.close AS month_ago_price
+        FROM bounds b
+        JOIN prices cur ON cur.ticker = b.ticker AND cur.date = b.last_date
+        JOIN prices ago ON ago.ticker = b.ticker AND ago.date = b.first_date
+    """).bindparams(bindparam("tickers", expanding=True))
+    result = pd.read_sql_query(query, engine, params={"tickers": list(tickers)})
+    if result.empty:
+        return pd.DataFrame(columns=columns)
+
+    result['percentage_change'] = ((result['current_price'] - result['month_ago_price']) / result['month_ago_price']) * 100
+    return result.sort_values('ticker').reset_index(drop=True)[columns]
+
 
 def find_top_gainers_losers():
 
     try:
         with open('src/tickers.txt', 'r') as f:
             tickers = [line.strip() for line in f.readlines() if line.strip()]
-    except FileNotFoundError:
+    except FileNotFoundError as e:
         print("Error: tickers.txt file not found")
         return {"message": f"Error generating top gainers and losers: {str(e)}", "status": 500}
-    
+
     print(f"Processing {len(tickers)} tickers...")
-    
-    results = []
-    for i, ticker in enumerate(tickers, 1):
-        print(f"Processing {ticker} ({i}/{len(tickers)})")
-        result = calculate_monthly_performance(ticker)
-        if result:
-            results.append(result)
-    
-    if not results:
-        print("No valid results found")
-        return
-
-    df = pd.DataFrame(results)
-    
-    df_sorted = df.sort_values('percentage_change', ascending=False)
 
     try:
-        load_dotenv()
-
-        DATABASE_URL = os.environ.get("DATABASE_URL")
-
-        if not DATABASE_URL:
-            raise ValueError("DATABASE_URL environment variable is not set")
-
-        engine = create_engine(DATABASE_URL)
-        df_sorted.to_sql("percentage_change", engine, if_exists='replace', index=False)
+        engine = get_engine()
+
+        df = calculate_monthly_performance(tickers, engine)
+        if df.empty:
+            print("No valid results found")
+            engine.dispose()
+            return {"message": "No valid results found", "status": 404}
+
+        df_sorted = df.sort_values('percentage_change', ascending=False)
+        ensure_data_versions_table(engine)
+        replace_table(df_sorted, "percentage_change", engine,
+                      before_commit=lambda conn: bump_data_version(conn, TOP_GAINERS_LOSERS_SCOPE))
 
         engine.dispose()
 
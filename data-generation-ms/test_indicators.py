@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Parity tests for incremental indicator computation against a full recompute
+"""
+import sys
+import os
+import warnings
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from src.indicators import add_indicators, add_indicators_tail, get_seed_window
+
+warnings.filterwarnings("ignore")
+
+RTOL = 1e-8
+
+
+def make_bars(n, seed=0):
+    """Generate a random walk of daily OHLCV bars"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "Date": pd.bdate_range("2020-01-01", periods=n).date,
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n).astype(float),
+    })
+
+
+CONFIGURED_INDICATORS = [
+    {"name": "sma_50", "indicator": "sma", "params": {"window": 50}},
+    {"name": "ema_20", "indicator": "ema", "params": {"window": 20}},
+    {"name": "rsi_14", "indicator": "rsi", "params": {"window": 14}},
+    {"name": "macd", "indicator": "macd"},
+    {"name": "bb", "indicator": "bollinger", "params": {"window": 20, "window_dev": 2}},
+    {"name": "adx", "indicator": "adx"},
+    {"name": "obv", "indicator": "obv"},
+    {"name": "nvi", "indicator": "nvi"},
+    {"name": "cr", "indicator": "cumulative_return"},
+]
+
+
+def assert_parity(history_rows, new_rows, seed_window, seed=0, specs=None):
+    bars = make_bars(history_rows + new_rows, seed)
+    full = add_indicators(bars.copy(), specs)
+
+    stored = full.iloc[:history_rows].iloc[-seed_window:]
+    new_bars = bars.iloc[history_rows:]
+    tail = add_indicators_tail(stored, new_bars, specs)
+
+    expected = full.iloc[history_rows:].reset_index(drop=True)
+    columns = [col for col in expected.columns if col != "Date"]
+    assert list(tail["Date"]) == list(expected["Date"])
+    for col in columns:
+        np.testing.assert_allclose(tail[col], expected[col], rtol=RTOL, atol=1e-9, err_msg=col)
+
+
+def test_single_new_bar():
+    """Daily run: one new bar on top of five years of history"""
+    assert_parity(1250, 1, get_seed_window())
+
+
+def test_several_new_bars():
+    """Catch-up run after a few missed days"""
+    assert_parity(1250, 7, get_seed_window(), seed=1)
+
+
+def test_short_history():
+    """History shorter than the seed window falls back to the full series"""
+    assert_parity(200, 3, get_seed_window(), seed=2)
+
+
+def test_configured_indicators():
+    """A configured indicator set, including cumulative indicators"""
+    assert_parity(1250, 2, get_seed_window(CONFIGURED_INDICATORS), seed=3, specs=CONFIGURED_INDICATORS)
+
+
+if __name__ == "__main__":
+    test_single_new_bar()
+    test_several_new_bars()
+    test_short_history()
+    test_configured_indicators()
+    print("Incremental indicators match the full recompute")